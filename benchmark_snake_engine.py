@@ -0,0 +1,407 @@
+"""Headless benchmarks for the Snake game engine.
+
+Every scenario is seeded, so numbers are comparable between commits:
+  env_step            SnakeEnvironment.step with scripted (pre-generated) actions, occupancy grid on
+  env_step_scan       the same with use_occupancy_grid=False (collision checks scan the deques)
+  match_series        run_match_series of best_snake_logic.py against every file in past_champions/
+  spawn_food_<W>x<H>  SnakeEnvironment._spawn_food on large grids, with and without the occupancy grid
+  champion_ai/<name>  each archived get_challenger_action on a corpus of recorded mid- and late-game
+                      states: ns/move, allocations per call and how the time grows with snake length
+  champion_ai_helpers the champions' helper functions (by name) ranked by time per move, from cProfile
+
+Results are printed as JSON. `--save-baseline FILE` stores them; `--baseline FILE` compares against a
+stored run and exits with status 1 when a throughput drops, or allocations grow, by more than --tolerance.
+Allocation figures come from a separate tracemalloc pass (so they do not slow the timed runs): the mean
+peak number of bytes allocated while one operation runs.
+"""
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import math
+import os
+import platform
+import pstats
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import main_snake_game as game
+
+BENCHMARK_SEED = 1234
+SPAWN_FOOD_GRIDS = [(100, 100), (400, 400)]
+SCENARIOS = ["env_step", "env_step_scan", "match_series", "spawn_food", "champion_ai"]
+CORPUS_GRIDS = [(20, 10), (40, 20)] # The larger board lets snakes grow long enough to show length scaling
+CORPUS_GAMES_PER_GRID = 12
+CORPUS_SAMPLE_EVERY = 5 # Steps between recorded states
+CORPUS_MIN_STEP = 10 # Openings are skipped: every champion plays them cheaply
+CORPUS_STATES_PER_LENGTH_BUCKET = 40
+LENGTH_BUCKETS = [5, 10, 15, 20, 30] # Lower bounds of the snake-length buckets in the report
+
+def scripted_actions(num_actions: int, seed: int) -> List[Tuple[int, int]]:
+    # Both snakes keep their heading and turn left or right 20% of the time, so games last long
+    # enough on the wrapping board to exercise growth and collisions, not only resets.
+    rng = random.Random(seed)
+    actions, headings = [], [rng.randrange(4), rng.randrange(4)]
+    for _ in range(num_actions):
+        for snake_idx in range(2):
+            if rng.random() < 0.2:
+                headings[snake_idx] = (headings[snake_idx] + rng.choice((1, 3))) % 4
+        actions.append(tuple(headings))
+    return actions
+
+def measure_allocations(op: Callable[[], None], count: int) -> float:
+    # Mean bytes allocated at peak per call of op, measured with tracemalloc.
+    tracemalloc.start()
+    total = 0
+    try:
+        for _ in range(count):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            op()
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / count if count else 0.0
+
+def best_of(repeat: int, run: Callable[[], Tuple[float, Dict[str, float]]]) -> Dict[str, float]:
+    # Runs a timed scenario `repeat` times and keeps the fastest run (least disturbed by other load).
+    best_seconds, best_counts = None, {}
+    for _ in range(repeat):
+        seconds, counts = run()
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds, best_counts = seconds, counts
+    metrics = {"seconds": round(best_seconds, 6)}
+    for name, count in best_counts.items():
+        metrics[name] = count
+        metrics[f"{name}_per_sec"] = round(count / best_seconds, 2) if best_seconds > 0 else 0.0
+    return metrics
+
+def bench_env_step(num_steps: int, repeat: int, use_occupancy_grid: bool = True) -> Dict[str, float]:
+    actions = scripted_actions(4096, BENCHMARK_SEED)
+
+    def make_stepper():
+        env = game.SnakeEnvironment(use_occupancy_grid=use_occupancy_grid, rng=random.Random(BENCHMARK_SEED))
+        env.reset()
+        state = {"i": 0, "games": 0}
+        def step_once():
+            if env.game_over:
+                env.reset()
+                state["games"] += 1
+            action1, action2 = actions[state["i"] % len(actions)]
+            state["i"] += 1
+            env.step(action1, action2)
+        return step_once, state
+
+    def run():
+        step_once, state = make_stepper()
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            step_once()
+        return time.perf_counter() - start, {"steps": num_steps, "games": state["games"]}
+
+    metrics = best_of(repeat, run)
+    step_once, _ = make_stepper()
+    metrics["alloc_bytes_per_step"] = round(measure_allocations(step_once, min(num_steps, 5000)), 1)
+    return metrics
+
+def bench_match_series(best_file: str, champions_dir: str, games_per_series: int, repeat: int,
+                       ai_runner: str = "inprocess") -> Dict[str, float]:
+    opponent_files = game.archived_logic_files(champions_dir)
+
+    def run():
+        profiler = game.MoveProfiler() # Counts moves, so steps/sec is known without touching the engine
+        random.seed(BENCHMARK_SEED) # run_match_series draws its game seeds from the global stream
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for opponent_file in opponent_files:
+                game.run_match_series(best_file, opponent_file, "Benchmark", os.path.basename(opponent_file)[:-3],
+                                      games_per_series, False, profiler=profiler, ai_runner=ai_runner)
+        seconds = time.perf_counter() - start
+        return seconds, {"steps": profiler.stats_for("Benchmark").calls, "games": games_per_series * len(opponent_files)}
+
+    metrics = best_of(repeat, run)
+    metrics["opponents"] = len(opponent_files)
+    return metrics
+
+def bench_spawn_food(width: int, height: int, num_spawns: int, repeat: int, use_occupancy_grid: bool) -> Dict[str, float]:
+    env = game.SnakeEnvironment(game.GameConfig(width, height), use_occupancy_grid=use_occupancy_grid,
+                                rng=random.Random(BENCHMARK_SEED))
+    env.reset()
+
+    def spawn_once():
+        env.foods.clear()
+        env._spawn_food()
+
+    def run():
+        start = time.perf_counter()
+        for _ in range(num_spawns):
+            spawn_once()
+        return time.perf_counter() - start, {"spawns": num_spawns}
+
+    metrics = best_of(repeat, run)
+    metrics["alloc_bytes_per_spawn"] = round(measure_allocations(spawn_once, min(num_spawns, 200)), 1)
+    return metrics
+
+def _snake_state(snake: game.Snake) -> Dict[str, Any]:
+    return {"positions": [list(pos) for pos in snake.positions], "direction": snake.direction_idx,
+            "length": snake.length, "score": snake.score}
+
+def record_state_corpus(best_file: str, champions_dir: str, seed: int = BENCHMARK_SEED) -> List[Dict[str, Any]]:
+    """Plays seeded games of best_file against archived champions and records states from their middle
+    and end, as JSON-friendly dicts seen from snake 1's side. Each length bucket keeps at most
+    CORPUS_STATES_PER_LENGTH_BUCKET states, so long snakes are not drowned out by short ones."""
+    best_logic = game.load_ai(best_file)
+    opponents = [logic for logic in map(game.load_ai, game.archived_logic_files(champions_dir)) if logic] or [best_logic]
+    if best_logic is None:
+        return []
+    buckets: Dict[int, List[Dict[str, Any]]] = {}
+    rng = random.Random(seed)
+    global_state = random.getstate() # The AIs draw from the global stream; leave it as we found it
+    try:
+        for width, height in CORPUS_GRIDS:
+            config = game.GameConfig(width, height)
+            for _ in range(CORPUS_GAMES_PER_GRID):
+                game_seed = rng.randrange(2**32)
+                opponent_logic = opponents[rng.randrange(len(opponents))]
+                env = game.SnakeEnvironment(config, rng=random.Random(game_seed))
+                env.reset()
+                random.seed(game_seed)
+                game_states = []
+                while not env.game_over:
+                    if env.steps_taken >= CORPUS_MIN_STEP and env.steps_taken % CORPUS_SAMPLE_EVERY == 0:
+                        game_states.append({"grid": [width, height], "step": env.steps_taken,
+                                            "my_snake": _snake_state(env.snake1), "opponent_snake": _snake_state(env.snake2),
+                                            "foods": [list(food.position) for food in env.foods]})
+                    actions = []
+                    for logic, me, other in ((best_logic, env.snake1, env.snake2), (opponent_logic, env.snake2, env.snake1)):
+                        try:
+                            action = logic(me, other, env.foods, width, height)
+                        except Exception:
+                            action = None
+                        valid_actions = me.get_valid_actions()
+                        actions.append(action if action in valid_actions else rng.choice(valid_actions or [me.direction_idx]))
+                    env.step(*actions)
+                for state in game_states:
+                    state["phase"] = "late" if state["step"] * 4 >= env.steps_taken * 3 else "mid" # Last quarter of the game
+                    bucket = buckets.setdefault(_length_bucket(state["my_snake"]["length"]), [])
+                    if len(bucket) < CORPUS_STATES_PER_LENGTH_BUCKET:
+                        bucket.append(state)
+    finally:
+        random.setstate(global_state)
+    return [state for bucket_start in sorted(buckets) for state in buckets[bucket_start]]
+
+def load_or_record_corpus(corpus_file: str, best_file: str, champions_dir: str) -> List[Dict[str, Any]]:
+    # A saved corpus keeps the champion benchmark comparable even after the engine or best_file change.
+    if corpus_file and os.path.exists(corpus_file):
+        with open(corpus_file) as f:
+            return json.load(f)
+    corpus = record_state_corpus(best_file, champions_dir)
+    if corpus_file:
+        with open(corpus_file, 'w') as f:
+            json.dump(corpus, f)
+    return corpus
+
+def _length_bucket(length: int) -> int:
+    return max(start for start in LENGTH_BUCKETS if start <= length) if length >= LENGTH_BUCKETS[0] else LENGTH_BUCKETS[0]
+
+def _call_args(state: Dict[str, Any]) -> Tuple:
+    # Fresh objects for every call, so an AI that mutates its inputs cannot affect the next one.
+    width, height = state["grid"]
+    config = game.GameConfig(width, height)
+    snakes = [game.Snake.from_state([tuple(pos) for pos in snake["positions"]], snake["direction"], snake["length"],
+                                    snake["score"], config=config)
+              for snake in (state["my_snake"], state["opponent_snake"])]
+    return snakes[0], snakes[1], [game.Food(tuple(pos)) for pos in state["foods"]], width, height
+
+def bench_champion_ai(logic_file: str, corpus: List[Dict[str, Any]], calls_per_state: int) -> Tuple[Dict[str, Any], pstats.Stats]:
+    logic = game.load_ai(logic_file)
+    if logic is None:
+        return {"error": "failed to load"}, None
+    prepared = [(state, [_call_args(state) for _ in range(calls_per_state)]) for state in corpus]
+    timings_ns, per_state_ns, exceptions = [], [], 0
+    global_state = random.getstate()
+    try:
+        for state_idx, (state, call_args) in enumerate(prepared):
+            random.seed(state_idx)
+            state_total = 0
+            for args in call_args:
+                start = time.perf_counter_ns()
+                try:
+                    logic(*args)
+                except Exception:
+                    exceptions += 1
+                elapsed = time.perf_counter_ns() - start
+                timings_ns.append(elapsed)
+                state_total += elapsed
+            per_state_ns.append(state_total / calls_per_state)
+
+        def call_each_state(args_list):
+            for args in args_list:
+                try:
+                    logic(*args)
+                except Exception:
+                    pass
+        fresh_args = [_call_args(state) for state in corpus]
+        random.seed(0)
+        alloc_bytes = measure_allocations(lambda: call_each_state(fresh_args), 1) / max(len(corpus), 1)
+        profiler = cProfile.Profile()
+        random.seed(0)
+        profiler.runcall(call_each_state, [_call_args(state) for state in corpus])
+    finally:
+        random.setstate(global_state)
+
+    timings_ns.sort()
+    lengths = [state["my_snake"]["length"] for state in corpus]
+    by_length: Dict[int, List[float]] = {}
+    for length, ns in zip(lengths, per_state_ns):
+        by_length.setdefault(_length_bucket(length), []).append(ns)
+    by_phase: Dict[str, List[float]] = {}
+    for state, ns in zip(corpus, per_state_ns):
+        by_phase.setdefault(state["phase"], []).append(ns)
+    ns_per_move = sum(timings_ns) / len(timings_ns)
+    metrics = {
+        "ns_per_move": round(ns_per_move),
+        "moves_per_sec": round(1e9 / ns_per_move, 2) if ns_per_move else 0.0,
+        "p99_ns": timings_ns[min(len(timings_ns) - 1, int(len(timings_ns) * 0.99))],
+        "max_ns": timings_ns[-1],
+        "alloc_bytes_per_call": round(alloc_bytes, 1),
+        "exceptions": exceptions,
+        "ns_by_length": {f"{start}+": round(sum(values) / len(values)) for start, values in sorted(by_length.items())},
+        "ns_by_phase": {phase: round(sum(values) / len(values)) for phase, values in sorted(by_phase.items())},
+        "length_exponent": _length_exponent(lengths, per_state_ns),
+    }
+    return metrics, pstats.Stats(profiler)
+
+def _length_exponent(lengths: List[int], ns: List[float]) -> float:
+    # Least-squares slope of log(time) against log(length): ~0 means flat, ~1 linear, ~2 quadratic in length.
+    points = [(math.log(length), math.log(t)) for length, t in zip(lengths, ns) if length > 0 and t > 0]
+    if len(points) < 2: return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x, 3) if var_x else 0.0
+
+def champion_hotspots(stats: pstats.Stats, logic_file: str, num_moves: int) -> Dict[str, Dict[str, float]]:
+    # Own time (excluding callees) of each function defined in the champion's file, per move.
+    code_filename = game.load_ai(logic_file).__code__.co_filename
+    hotspots = {}
+    for (filename, _, function_name), (_, num_calls, own_time, _, _) in stats.stats.items():
+        if filename == code_filename:
+            hotspots[function_name] = {"ns_per_move": own_time * 1e9 / num_moves, "calls_per_move": num_calls / num_moves}
+    return hotspots
+
+def bench_champions(best_file: str, champions_dir: str, corpus_file: str, calls_per_state: int) -> Dict[str, Dict[str, Any]]:
+    corpus = load_or_record_corpus(corpus_file, best_file, champions_dir)
+    results: Dict[str, Dict[str, Any]] = {}
+    helpers: Dict[str, Dict[str, float]] = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for logic_file in game.archived_logic_files(champions_dir):
+            name = os.path.basename(logic_file)[:-3]
+            metrics, stats = bench_champion_ai(logic_file, corpus, calls_per_state)
+            if stats is not None:
+                hotspots = champion_hotspots(stats, logic_file, len(corpus))
+                ranked = sorted(hotspots.items(), key=lambda item: -item[1]["ns_per_move"])
+                metrics["hotspots"] = {function_name: round(values["ns_per_move"]) for function_name, values in ranked[:3]}
+                for function_name, values in hotspots.items():
+                    helper = helpers.setdefault(function_name, {"champions": 0, "ns_per_move": 0.0, "calls_per_move": 0.0})
+                    helper["champions"] += 1
+                    helper["ns_per_move"] += values["ns_per_move"]
+                    helper["calls_per_move"] += values["calls_per_move"]
+            results[f"champion_ai/{name}"] = metrics
+    # Averaged over the champions that define the helper; profiled times include cProfile's own overhead
+    results["champion_ai_helpers"] = {
+        function_name: {"champions": helper["champions"],
+                        "ns_per_move": round(helper["ns_per_move"] / helper["champions"]),
+                        "calls_per_move": round(helper["calls_per_move"] / helper["champions"], 2)}
+        for function_name, helper in sorted(helpers.items(), key=lambda item: -item[1]["ns_per_move"] / item[1]["champions"])}
+    results["champion_ai_corpus"] = {"states": len(corpus),
+                                     "mid": sum(state["phase"] == "mid" for state in corpus),
+                                     "late": sum(state["phase"] == "late" for state in corpus)}
+    return results
+
+def run_benchmarks(scenarios: List[str], quick: bool, repeat: int, best_file: str, champions_dir: str,
+                   series_games: int, ai_runner: str, corpus_file: str = None) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, float]] = {}
+    steps = 5000 if quick else 50000
+    if "env_step" in scenarios:
+        results["env_step"] = bench_env_step(steps, repeat)
+    if "env_step_scan" in scenarios:
+        results["env_step_scan"] = bench_env_step(steps, repeat, use_occupancy_grid=False)
+    if "match_series" in scenarios:
+        results["match_series"] = bench_match_series(best_file, champions_dir, 1 if quick else series_games, repeat, ai_runner)
+    if "spawn_food" in scenarios:
+        for width, height in SPAWN_FOOD_GRIDS:
+            results[f"spawn_food_{width}x{height}"] = bench_spawn_food(width, height, 2000 if quick else 20000, repeat, True)
+            # Scanning every cell is ~W*H work per spawn, so it gets far fewer iterations
+            results[f"spawn_food_{width}x{height}_scan"] = bench_spawn_food(width, height, 20 if quick else 200, repeat, False)
+    if "champion_ai" in scenarios:
+        results.update(bench_champions(best_file, champions_dir, corpus_file, 1 if quick else repeat))
+    return results
+
+def compare_to_baseline(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                        tolerance: float) -> List[Dict[str, object]]:
+    # Rates (`*_per_sec`) should not fall and allocations (`alloc_*`) should not rise by more than tolerance.
+    comparison = []
+    for scenario, metrics in results.items():
+        for name, value in metrics.items():
+            old = baseline.get(scenario, {}).get(name)
+            higher_is_better = name.endswith("_per_sec")
+            if not isinstance(old, (int, float)) or not isinstance(value, (int, float)) \
+                    or not (higher_is_better or name.startswith("alloc_")):
+                continue
+            change = (value - old) / old if old else 0.0
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            comparison.append({"scenario": scenario, "metric": name, "baseline": old, "current": value,
+                               "change": round(change, 4), "regressed": regressed})
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the Snake game engine.")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS, help='Scenarios to run (default: all).')
+    parser.add_argument('--quick', action='store_true', help='Fewer iterations, for a fast smoke run.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per scenario; the fastest is reported.')
+    parser.add_argument('--best-file', type=str, default='best_snake_logic.py', help='Champion played in the match_series scenario (and in the games the state corpus is recorded from).')
+    parser.add_argument('--champions-dir', type=str, default=game.PAST_CHAMPIONS_DIR, help='Archived champions: opponents for match_series, benchmarked by champion_ai.')
+    parser.add_argument('--series-games', type=int, default=4, help='Games per match series in the match_series scenario.')
+    parser.add_argument('--corpus', type=str, help='State corpus for the champion_ai scenario: loaded if the file exists, otherwise recorded and saved there.')
+    parser.add_argument('--ai-runner', choices=['inprocess', 'subprocess', 'subprocess-pipe'], default='inprocess', help='How the match_series scenario runs AI code.')
+    parser.add_argument('--output', type=str, help='Also write the JSON results to this file.')
+    parser.add_argument('--save-baseline', type=str, help='Write the results to this file for later --baseline runs.')
+    parser.add_argument('--baseline', type=str, help='Compare against results saved with --save-baseline.')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Relative change allowed before a metric counts as a regression.')
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": BENCHMARK_SEED,
+        "quick": args.quick,
+        "results": run_benchmarks(args.scenarios, args.quick, args.repeat, args.best_file, args.champions_dir,
+                                  args.series_games, args.ai_runner, args.corpus),
+    }
+    regressed = False
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error: Could not read baseline {args.baseline}: {e}", file=sys.stderr)
+            sys.exit(2)
+        report["comparison"] = compare_to_baseline(report["results"], baseline.get("results", {}), args.tolerance)
+        regressed = any(entry["regressed"] for entry in report["comparison"])
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w') as f:
+            f.write(output + "\n")
+    if regressed:
+        print("Benchmark regression against the baseline (see 'comparison').", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,41 @@
 # --- START OF FILE main_snake_game.py ---
 
 import os
+import sys
 import random
 import time
 import shutil
-import importlib.util
+import hashlib
+import marshal
+import ast
+import importlib
+import sqlite3
+from types import CodeType, ModuleType
 from collections import deque
-from dataclasses import dataclass
-from typing import List, Tuple, Optional, Callable, Dict, Any
+from dataclasses import dataclass, asdict
+from contextlib import contextmanager
+from typing import List, Tuple, Optional, Callable, Dict, Any, Set
 import re
+import math
 import argparse
 import json
+import signal
+import atexit
+import struct
+import threading
+import multiprocessing
+import multiprocessing.util
+from multiprocessing import shared_memory
+from collections.abc import Sequence
+from array import array
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, as_completed
+
+# Optional: NumPy powers the vectorized BatchSnakeEnvironment
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Attempt to import Groq
 try:
@@ -18,6 +43,12 @@ try:
 except ImportError:
     Groq = None # Will be checked later
 
+# Optional: tiktoken gives exact prompt token counts (otherwise they are estimated)
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 # --- Constants ---
 GRID_WIDTH = 20
 GRID_HEIGHT = 10
@@ -27,29 +58,127 @@ MAX_STEPS_PER_EPISODE = GRID_WIDTH * GRID_HEIGHT * 2 # Increased steps for longe
 
 SEED = 42
 LEADERBOARD_SIZE = 5
-LEADERBOARD_FILE = "leaderboard.json"
+LEADERBOARD_FILE = "leaderboard.json" # JSON export of the leaderboard store
+LEADERBOARD_DB_FILE = "leaderboard.sqlite3"
 PAST_CHAMPIONS_DIR = "past_champions"
 DEFAULT_CHALLENGER_NAME = "DefaultChallenger"
 MAX_GAUNTLET_OPPONENTS = 3 # Challenger must beat up to this many top snakes
-
+# Glicko ratings: new AIs start at 1500 +- 350; the deviation never drops below the floor, so ratings keep moving.
+GLICKO_INITIAL_RATING = 1500.0
+GLICKO_INITIAL_RD = 350.0
+GLICKO_MIN_RD = 30.0
+AI_RUNNER_CACHE_SIZE = 8 # Child processes kept alive by --ai-runner subprocess (least recently used are closed)
+AI_RUNNER_START_TIMEOUT = 30.0 # Seconds a new runner child may take to start the interpreter and load its logic
+LOGIC_CACHE_SIZE = 128 # Loaded AI modules kept in memory per process (least recently used are dropped)
+LOGIC_CODE_CACHE_MAX_FILES = 512 # Compiled code files kept in --code-cache-dir (least recently used are deleted)
+
+# Sequential probability ratio test for --early-stop sprt: H0 "challenger wins a decisive game with
+# probability SPRT_P0" against H1 "... with probability SPRT_P1", with error rates alpha and beta.
+SPRT_P0 = 0.45
+SPRT_P1 = 0.55
+SPRT_ALPHA = 0.05
+SPRT_BETA = 0.05
+# Pre-screen rejects challengers that lose more than this share of games to a baseline, or (if that is more) this
+# margin more than the reigning champion loses on the same games: strong champions can lose to the greedy baseline too.
+PRESCREEN_MAX_LOSS_RATE = 0.5
+PRESCREEN_LOSS_MARGIN = 0.3
+PRESCREEN_MAX_FAULT_RATE = 0.02 # ...or whose moves raise, time out or are invalid more often than this
+PRESCREEN_MOVE_DEADLINE = 0.25 # Seconds per move during the pre-screen when --move-deadline-ms is not set
+MATCH_CACHE_VERSION = 1 # Bump when game rules or seeding change, so cached game results are not reused
+
+
+# --- Game Configuration ---
+@dataclass(frozen=True)
+class GameConfig:
+    # Board size and rules for one game. Limits left as None scale with the board, like the module defaults.
+    grid_width: int = GRID_WIDTH
+    grid_height: int = GRID_HEIGHT
+    initial_snake_length: int = INITIAL_SNAKE_LENGTH
+    max_snake_length: Optional[int] = None
+    max_steps_per_episode: Optional[int] = None
+
+    def __post_init__(self):
+        if self.max_snake_length is None:
+            object.__setattr__(self, "max_snake_length", self.grid_width * self.grid_height // 2)
+        if self.max_steps_per_episode is None:
+            object.__setattr__(self, "max_steps_per_episode", self.grid_width * self.grid_height * 2)
+
+DEFAULT_GAME_CONFIG = GameConfig()
 
 # --- Game Classes ---
 @dataclass
 class Food:
     position: Tuple[int, int]
 
+class OccupancyGrid:
+    """Flat per-cell owner bitmasks shared by both snakes of a SnakeEnvironment.
+
+    Cells are stored x-major (index = x * height + y) so that scanning the buffer
+    visits cells in the same order as the `for x ... for y ...` loops used elsewhere.
+    Unowned cells are also kept in `free_cells` (swap-remove list, with each cell's slot
+    in `free_slot`, -1 when owned) so a random empty cell can be drawn in O(1).
+    """
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.clear()
+
+    def clear(self):
+        self.cells[:] = bytes(len(self.cells))
+        self.free_cells = list(range(len(self.cells)))
+        self.free_slot = list(range(len(self.cells)))
+
+    def mark_cell(self, cell: int, bit: int):
+        if not self.cells[cell]: # Cell stops being free: move the last free cell into its slot
+            slot = self.free_slot[cell]
+            last = self.free_cells.pop()
+            if last != cell:
+                self.free_cells[slot] = last
+                self.free_slot[last] = slot
+            self.free_slot[cell] = -1
+        self.cells[cell] |= bit
+
+    def unmark_cell(self, cell: int, bit: int):
+        self.cells[cell] &= ~bit & 0xFF
+        if not self.cells[cell] and self.free_slot[cell] < 0:
+            self.free_slot[cell] = len(self.free_cells)
+            self.free_cells.append(cell)
+
+    def mark(self, pos: Tuple[int, int], bit: int):
+        self.mark_cell(pos[0] * self.height + pos[1], bit)
+
+    def unmark(self, pos: Tuple[int, int], bit: int):
+        self.unmark_cell(pos[0] * self.height + pos[1], bit)
+
+    def is_occupied(self, pos: Tuple[int, int], mask: int = 0xFF) -> bool:
+        return bool(self.cells[pos[0] * self.height + pos[1]] & mask)
+
+    def empty_cells(self, mask: int = 0xFF) -> List[Tuple[int, int]]:
+        height = self.height
+        return [divmod(i, height) for i, owners in enumerate(self.cells) if not owners & mask]
+
+    def random_free_cell(self, rng=random) -> Optional[Tuple[int, int]]:
+        # Uniform over cells no snake owns.
+        if not self.free_cells: return None
+        return divmod(rng.choice(self.free_cells), self.height)
+
 class Snake:
     DIRECTIONS_MAP = [(0, -1), (1, 0), (0, 1), (-1, 0)] # UP, RIGHT, DOWN, LEFT
     ACTIONS_LIST = [0, 1, 2, 3]
     OPPOSITE_ACTIONS_MAP = {0: 2, 1: 3, 2: 0, 3: 1}
 
-    def __init__(self, x: int, y: int, initial_direction_idx: Optional[int] = None):
+    def __init__(self, x: int, y: int, initial_direction_idx: Optional[int] = None,
+                 config: GameConfig = DEFAULT_GAME_CONFIG):
+        self.config = config
         self.positions = deque() # Initialize empty, then add head first
         self.direction_idx = initial_direction_idx if initial_direction_idx is not None \
                              else random.choice(self.ACTIONS_LIST)
-        self.length = INITIAL_SNAKE_LENGTH
+        self.length = config.initial_snake_length
         self.score = 0
         self.is_alive = True
+        self.occupancy: Optional[OccupancyGrid] = None # Set by attach_occupancy() when the engine tracks cells
+        self.occupancy_bit = 0
 
         # Initialize head
         head_pos = (x,y)
@@ -70,9 +199,9 @@ class Snake:
         dx_segment_growth = -self.DIRECTIONS_MAP[self.direction_idx][0]
         dy_segment_growth = -self.DIRECTIONS_MAP[self.direction_idx][1]
 
-        for _ in range(1, INITIAL_SNAKE_LENGTH):
-            next_segment_x = (current_segment_x + dx_segment_growth + GRID_WIDTH) % GRID_WIDTH
-            next_segment_y = (current_segment_y + dy_segment_growth + GRID_HEIGHT) % GRID_HEIGHT
+        for _ in range(1, config.initial_snake_length):
+            next_segment_x = (current_segment_x + dx_segment_growth + config.grid_width) % config.grid_width
+            next_segment_y = (current_segment_y + dy_segment_growth + config.grid_height) % config.grid_height
             
             # Check for immediate overlap during initialization (highly unlikely for small INITIAL_SNAKE_LENGTH)
             if (next_segment_x, next_segment_y) in self.positions:
@@ -83,6 +212,28 @@ class Snake:
             
             self.positions.append((next_segment_x, next_segment_y))
             current_segment_x, current_segment_y = next_segment_x, next_segment_y
+
+    @classmethod
+    def from_state(cls, positions, direction_idx: int, length: int, score: int = 0, is_alive: bool = True,
+                   config: GameConfig = DEFAULT_GAME_CONFIG) -> "Snake":
+        # Builds a snake from an existing body (head first) instead of laying out a fresh one.
+        snake = cls.__new__(cls)
+        snake.config = config
+        snake.positions = deque(positions)
+        snake.direction_idx = direction_idx
+        snake.length = length
+        snake.score = score
+        snake.is_alive = is_alive
+        snake.occupancy = None
+        snake.occupancy_bit = 0
+        return snake
+
+    def attach_occupancy(self, occupancy: OccupancyGrid, bit: int):
+        # Registers the current body on the shared grid; move() keeps it in sync from then on.
+        self.occupancy = occupancy
+        self.occupancy_bit = bit
+        for pos in self.positions:
+            occupancy.mark(pos, bit)
         
     def get_head_position(self) -> Tuple[int, int]:
         return self.positions[0]
@@ -102,7 +253,23 @@ class Snake:
         self.direction_idx = action_idx
         head_x, head_y = self.get_head_position()
         dx, dy = self.get_current_direction_vector()
-        new_head = ((head_x + dx) % GRID_WIDTH, (head_y + dy) % GRID_HEIGHT)
+        new_head = ((head_x + dx) % self.config.grid_width, (head_y + dy) % self.config.grid_height)
+
+        occupancy = self.occupancy
+        if occupancy is not None:
+            # O(1) self-collision check against the shared grid. The tail cell is free if it is about to move away.
+            height, bit = occupancy.height, self.occupancy_bit
+            new_head_cell = new_head[0] * height + new_head[1]
+            drops_tail = len(self.positions) >= self.length
+            if occupancy.cells[new_head_cell] & bit and not (drops_tail and new_head == self.positions[-1]):
+                self.is_alive = False
+                return True
+            if drops_tail:
+                tail_x, tail_y = self.positions.pop()
+                occupancy.unmark_cell(tail_x * height + tail_y, bit)
+            self.positions.appendleft(new_head)
+            occupancy.mark_cell(new_head_cell, bit)
+            return False
 
         # Check for self-collision (excluding the tail if it's about to move away)
         body_to_check = list(self.positions)
@@ -120,7 +287,7 @@ class Snake:
 
     def grow(self):
         if not self.is_alive: return
-        self.length = min(self.length + 1, MAX_SNAKE_LENGTH)
+        self.length = min(self.length + 1, self.config.max_snake_length)
         self.score += 1
 
 # --- Helper strings for LLM Prompt ---
@@ -137,28 +304,408 @@ SNAKE_CLASS_API_DOCS = f"""
 - `OPPOSITE_ACTIONS_MAP`: Class attribute `Snake.OPPOSITE_ACTIONS_MAP` = {Snake.OPPOSITE_ACTIONS_MAP}. Your function will have access to `my_snake.OPPOSITE_ACTIONS_MAP`.
 """
 
-GAME_CONSTANTS_DOCS = f"""
-- GRID_WIDTH: {GRID_WIDTH} (width of the game board)
-- GRID_HEIGHT: {GRID_HEIGHT} (height of the game board)
-- INITIAL_SNAKE_LENGTH: {INITIAL_SNAKE_LENGTH}
-- MAX_SNAKE_LENGTH: {MAX_SNAKE_LENGTH}
-- MAX_STEPS_PER_EPISODE: {MAX_STEPS_PER_EPISODE} (game ends if it lasts this long)
+def format_game_constants_docs(config: GameConfig) -> str:
+    return f"""
+- GRID_WIDTH: {config.grid_width} (width of the game board)
+- GRID_HEIGHT: {config.grid_height} (height of the game board)
+- INITIAL_SNAKE_LENGTH: {config.initial_snake_length}
+- MAX_SNAKE_LENGTH: {config.max_snake_length}
+- MAX_STEPS_PER_EPISODE: {config.max_steps_per_episode} (game ends if it lasts this long)
 """
 
+GAME_CONSTANTS_DOCS = format_game_constants_docs(DEFAULT_GAME_CONFIG)
+
+# --- Helper: Static Validation of AI Logic ---
+# Modules AI logic may import. Everything else (os, socket, subprocess, pathlib, ...) is rejected before the code runs.
+# numpy is left out: savetxt/load/ctypeslib and friends read and write files.
+ALLOWED_LOGIC_IMPORTS = {"random", "math", "collections", "heapq", "itertools", "functools", "typing", "dataclasses",
+                         "bisect", "operator", "copy", "enum", "statistics", "array", "re"}
+# Names AI logic may take with `from main_snake_game import ...` (the module itself reaches os, sqlite3, ...).
+ALLOWED_GAME_IMPORTS = {"Snake", "Food", "GameConfig", "GRID_WIDTH", "GRID_HEIGHT", "INITIAL_SNAKE_LENGTH",
+                        "MAX_SNAKE_LENGTH", "MAX_STEPS_PER_EPISODE"}
+FORBIDDEN_LOGIC_NAMES = {"open", "exec", "eval", "compile", "__import__", "input", "breakpoint", "exit", "quit",
+                         "globals", "vars", "getattr", "setattr", "delattr", "__builtins__"}
+# Members of allowed modules that look attributes up by a string (attrgetter('__init__.__globals__')) or evaluate one.
+FORBIDDEN_LOGIC_MODULE_ATTRIBUTES = {"operator.attrgetter", "operator.methodcaller", "typing.get_type_hints",
+                                     "typing.ForwardRef"}
+FORBIDDEN_LOGIC_ATTRIBUTES = {"__globals__", "__builtins__", "__subclasses__", "__code__", "__closure__", "__bases__",
+                              "__mro__", "__loader__", "__spec__", "__getattribute__"}
+MAX_LOGIC_LITERAL_SIZE = 100_000 # Characters, bytes or elements in one literal (or literal * n)
+UNBOUNDED_LOGIC_ITERATORS = {"itertools.count", "itertools.cycle", "itertools.repeat"} # repeat() without `times`
+# Class hooks that run code of the file as soon as a class statement or subscription executes.
+FORBIDDEN_LOGIC_CLASS_HOOKS = {"__init_subclass__", "__set_name__", "__class_getitem__"}
+LOGIC_LOAD_TIMEOUT = 5.0 # Seconds the module code of an AI file may run while it is loaded
+MAX_LOGIC_INT_BITS = 4096
+AI_FUNCTION_ARGS = ("my_snake", "opponent_snake", "foods", "grid_width", "grid_height")
+
+def _literal_int(node: ast.AST) -> Optional[int]:
+    # Value of a small constant integer expression (e.g. 10**6), float('inf') if it would be huge, None if not constant.
+    if isinstance(node, ast.Constant) and isinstance(node.value, int) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _literal_int(node.operand)
+        return None if value is None else (-value if isinstance(node.op, ast.USub) else value)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Pow)):
+        left, right = _literal_int(node.left), _literal_int(node.right)
+        if left is None or right is None: return None
+        if math.inf in (left, right, -left, -right): return math.inf
+        if isinstance(node.op, ast.Pow):
+            if right < 0: return None
+            if abs(left) > 1 and abs(left).bit_length() * right > MAX_LOGIC_INT_BITS: return math.inf
+            return left ** right
+        if isinstance(node.op, ast.Mult) and left and right \
+                and abs(left).bit_length() + abs(right).bit_length() > MAX_LOGIC_INT_BITS:
+            return math.inf
+        return left + right if isinstance(node.op, ast.Add) else left - right if isinstance(node.op, ast.Sub) else left * right
+    return None
+
+def _literal_size(node: ast.AST) -> Optional[int]:
+    # Length of a str/bytes constant or a list/tuple/set/dict display.
+    if isinstance(node, ast.Constant) and isinstance(node.value, (str, bytes)): return len(node.value)
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)): return len(node.elts)
+    if isinstance(node, ast.Dict): return len(node.keys)
+    return None
+
+def _module_attribute(module_name: str, attr: str) -> Optional[str]:
+    # Why module_name.attr may not be used: private names, and modules other than the package's own submodules
+    # (random.os, typing.sys, ...) which would hand AI code an unlisted module.
+    if attr.startswith('_'):
+        return "private module attribute"
+    if f"{module_name}.{attr}" in FORBIDDEN_LOGIC_MODULE_ATTRIBUTES:
+        return "looks up attributes by name"
+    try:
+        value = getattr(importlib.import_module(module_name), attr, None)
+    except ImportError:
+        return None # Not importable here; the import itself fails when the logic is loaded
+    if isinstance(value, ModuleType) and not value.__name__.startswith(module_name.split('.')[0] + '.'):
+        return "module object"
+    return None
+
+def _root_name(node: ast.AST) -> Optional[str]:
+    # `spin` for spin, spin.attr, spin[0] and spin()(); None for anything not rooted in a plain name.
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+def _module_callables(tree: ast.Module) -> set:
+    # Module-level names that hold (or contain) functions and classes defined in the file: the defs
+    # themselves and names assigned from expressions mentioning them or a lambda. Calling any of these
+    # while the module loads would run the file's own code before a move deadline applies.
+    callables = set()
+    changed = True
+    while changed: # Until aliases of aliases are found as well
+        changed = False
+        for stmt in tree.body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names, value = {stmt.name}, None
+            elif isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)) and stmt.value is not None:
+                targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+                names = {n.id for target in targets for n in ast.walk(target) if isinstance(n, ast.Name)}
+                value = stmt.value
+            else:
+                continue
+            if value is not None and not any(isinstance(n, ast.Lambda) or (isinstance(n, ast.Name) and n.id in callables)
+                                             for n in ast.walk(value)):
+                continue
+            if not names <= callables:
+                callables |= names
+                changed = True
+    return callables
+
+def _bounded_iterable(node: ast.AST) -> bool:
+    # A literal display or a range() of small constants: safe to loop over while the module loads.
+    if _literal_size(node) is not None:
+        return _literal_size(node) <= MAX_LOGIC_LITERAL_SIZE
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'range' \
+            and not node.keywords and 1 <= len(node.args) <= 3:
+        bounds = [_literal_int(arg) for arg in node.args]
+        return all(bound is not None and abs(bound) <= MAX_LOGIC_LITERAL_SIZE for bound in bounds)
+    return False
+
+class _LogicChecker(ast.NodeVisitor):
+    def __init__(self, module_callables: Optional[set] = None):
+        self.problems: List[str] = []
+        self.function_depth = 0
+        self.module_aliases: Dict[str, str] = {} # Local name -> imported module name
+        self.imported_names: Dict[str, str] = {} # Local name -> "module.name" for `from module import name`
+        self.module_callables = module_callables or set() # See _module_callables
+
+    def report(self, node: ast.AST, message: str):
+        self.problems.append(f"line {getattr(node, 'lineno', '?')}: {message}")
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            if alias.name.split('.')[0] not in ALLOWED_LOGIC_IMPORTS:
+                self.report(node, f"import of '{alias.name}' is not allowed")
+            elif alias.asname:
+                self.module_aliases[alias.asname] = alias.name
+            else:
+                self.module_aliases[alias.name.split('.')[0]] = alias.name.split('.')[0]
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ''
+        if not node.level and module == "main_snake_game":
+            for alias in node.names:
+                if alias.name not in ALLOWED_GAME_IMPORTS:
+                    self.report(node, f"import of '{alias.name}' from main_snake_game is not allowed")
+            return
+        if node.level or module.split('.')[0] not in ALLOWED_LOGIC_IMPORTS:
+            self.report(node, f"import from '{'.' * node.level}{module}' is not allowed")
+            return
+        for alias in node.names:
+            problem = "star import" if alias.name == '*' else _module_attribute(module, alias.name)
+            if problem:
+                self.report(node, f"import of '{alias.name}' from '{module}' is not allowed ({problem})")
+            elif isinstance(getattr(sys.modules.get(module), alias.name, None), ModuleType):
+                self.module_aliases[alias.asname or alias.name] = f"{module}.{alias.name}"
+            else:
+                self.imported_names[alias.asname or alias.name] = f"{module}.{alias.name}"
+
+    def visit_Name(self, node: ast.Name):
+        if node.id in FORBIDDEN_LOGIC_NAMES:
+            self.report(node, f"use of '{node.id}' is not allowed")
+        elif node.id in self.module_aliases:
+            # Bare uses (m = random; m._os) would hide the module from the attribute check below.
+            self.report(node, f"module '{node.id}' may only be used as `{node.id}.name`")
+
+    def _module_path(self, node: ast.AST) -> Optional[str]:
+        # Dotted module name for `alias` or `alias.submodule...`, None if node is not a module reference.
+        if isinstance(node, ast.Name):
+            return self.module_aliases.get(node.id)
+        if isinstance(node, ast.Attribute):
+            parent = self._module_path(node.value)
+            if parent and isinstance(getattr(sys.modules.get(parent), node.attr, None), ModuleType):
+                return f"{parent}.{node.attr}"
+        return None
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if node.attr in FORBIDDEN_LOGIC_ATTRIBUTES:
+            self.report(node, f"access to '.{node.attr}' is not allowed")
+        module = self._module_path(node.value)
+        if module is None:
+            self.generic_visit(node)
+            return
+        problem = _module_attribute(module, node.attr)
+        if problem:
+            self.report(node, f"access to '{module}.{node.attr}' is not allowed ({problem})")
+        if isinstance(node.value, ast.Attribute):
+            self.visit_Attribute(node.value)
+
+    def visit_Expr(self, node: ast.Expr):
+        if not (isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)): # Docstrings are never used
+            self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        size = _literal_size(node)
+        if size is not None and size > MAX_LOGIC_LITERAL_SIZE:
+            self.report(node, f"literal of {size} characters is too large")
+        elif isinstance(node.value, str) and re.search(r"__\w+__", node.value):
+            # Dunder names in strings only serve attribute lookups by name ("{0.__init__.__globals__}".format(...)).
+            self.report(node, "string with a dunder name is not allowed")
+        elif isinstance(node.value, int) and not isinstance(node.value, bool) and abs(node.value).bit_length() > MAX_LOGIC_INT_BITS:
+            self.report(node, "integer literal is too large")
+
+    def visit_BinOp(self, node: ast.BinOp):
+        value = _literal_int(node)
+        if value is not None and abs(value) == math.inf:
+            self.report(node, "constant expression is too large")
+            return
+        if isinstance(node.op, ast.Mult):
+            for sequence, count in ((node.left, node.right), (node.right, node.left)):
+                size, repeat = _literal_size(sequence), _literal_int(count)
+                if size is not None and repeat is not None and size * repeat > MAX_LOGIC_LITERAL_SIZE:
+                    self.report(node, "repeated literal is too large")
+                    return
+        self.generic_visit(node)
+
+    def _visit_collection(self, node: ast.AST):
+        if _literal_size(node) > MAX_LOGIC_LITERAL_SIZE:
+            self.report(node, f"literal with {_literal_size(node)} elements is too large")
+            return
+        self.generic_visit(node)
+
+    visit_List = visit_Tuple = visit_Set = visit_Dict = _visit_collection
+
+    # Code outside functions runs while the file is loaded, before any move deadline applies, so loops
+    # there must be visibly bounded and may not call into the file's own functions. Function bodies are
+    # left to the move deadline and --ai-runner; the load itself also runs under LOGIC_LOAD_TIMEOUT.
+    def _qualified_name(self, node: ast.AST) -> Optional[str]:
+        if isinstance(node, ast.Name):
+            return self.imported_names.get(node.id, node.id)
+        if isinstance(node, ast.Attribute):
+            module = self._module_path(node.value)
+            return f"{module}.{node.attr}" if module else None
+        return None
+
+    def visit_Call(self, node: ast.Call):
+        if self.function_depth == 0:
+            name = _root_name(node.func)
+            if isinstance(node.func, ast.Lambda) or name in self.module_callables:
+                self.report(node, f"module-level call of '{name or 'lambda'}', defined in this file")
+            for value in node.args + [keyword.value for keyword in node.keywords if keyword.arg != "default_factory"]:
+                if isinstance(value, ast.Lambda) or _root_name(value) in self.module_callables:
+                    self.report(node, "module-level call is passed a function defined in this file")
+            qualified = self._qualified_name(node.func)
+            if qualified == "range" and not _bounded_iterable(node):
+                self.report(node, "module-level range() must have small constant bounds")
+            elif qualified == "iter" and len(node.args) == 2:
+                self.report(node, "module-level iter(callable, sentinel)")
+            elif qualified in UNBOUNDED_LOGIC_ITERATORS and not (qualified == "itertools.repeat" and
+                                                                 (len(node.args) > 1 or node.keywords)):
+                self.report(node, f"module-level {qualified}() never ends")
+        self.generic_visit(node)
+
+    def _check_decorators(self, node: ast.AST):
+        for decorator in node.decorator_list:
+            if _root_name(decorator) in self.module_callables and not isinstance(decorator, ast.Call):
+                self.report(decorator, f"decorator '{_root_name(decorator)}' defined in this file runs at load time")
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        if self.function_depth == 0:
+            self._check_decorators(node)
+            if any(keyword.arg == "metaclass" for keyword in node.keywords):
+                self.report(node, "metaclasses are not allowed")
+            for stmt in node.body:
+                if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)) and stmt.name in FORBIDDEN_LOGIC_CLASS_HOOKS:
+                    self.report(stmt, f"'{stmt.name}' is not allowed")
+        self.generic_visit(node)
+
+    def visit_While(self, node: ast.While):
+        if self.function_depth == 0:
+            self.report(node, "module-level while loop")
+        self.generic_visit(node)
+
+    def visit_For(self, node: ast.For):
+        if self.function_depth == 0 and not _bounded_iterable(node.iter):
+            self.report(node, "module-level for loop must iterate over a literal or a small constant range()")
+        self.generic_visit(node)
+
+    visit_AsyncFor = visit_For
+
+    def visit_comprehension(self, node: ast.comprehension):
+        if self.function_depth == 0 and not _bounded_iterable(node.iter):
+            self.report(node.iter, "module-level comprehension must iterate over a literal or a small constant range()")
+        self.generic_visit(node)
+
+    def _visit_scope(self, node: ast.AST):
+        # Decorators and default values are evaluated where the function is defined; only the body is deferred.
+        if not isinstance(node, ast.Lambda):
+            if self.function_depth == 0: self._check_decorators(node)
+            for decorator in node.decorator_list: self.visit(decorator)
+            if node.returns: self.visit(node.returns)
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+            self.visit(default)
+        self.function_depth += 1
+        for stmt in ([node.body] if isinstance(node, ast.Lambda) else node.body):
+            self.visit(stmt)
+        self.function_depth -= 1
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_Lambda = _visit_scope
+
+def validate_logic_source(source, filepath: str = "<logic>", function_name: str = "get_challenger_action") -> List[str]:
+    # Static checks run before AI code is executed: it must parse, define function_name so that it accepts
+    # the five AI arguments, import only ALLOWED_LOGIC_IMPORTS (and ALLOWED_GAME_IMPORTS from this module),
+    # avoid obvious file/eval escapes and private or module attributes of what it imports, keep module-level
+    # loops bounded and not call its own functions while loading, and avoid huge literals. These checks reject common mistakes and escapes; they are not a
+    # sandbox, and code inside the AI function is only bounded by the move deadline.
+    # Returns the problems found (empty if the code looks loadable).
+    try:
+        tree = ast.parse(source, filepath)
+    except (SyntaxError, ValueError) as e:
+        return [f"does not parse: {e}"]
+    checker = _LogicChecker(_module_callables(tree))
+    checker.visit(tree)
+    functions = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name == function_name]
+    if not functions:
+        checker.problems.append(f"no module-level function '{function_name}'")
+    else:
+        args = functions[-1].args
+        positional = len(args.posonlyargs) + len(args.args)
+        if any(default is None for default in args.kw_defaults):
+            checker.problems.append(f"'{function_name}' has required keyword-only arguments")
+        if not (positional - len(args.defaults) <= len(AI_FUNCTION_ARGS) and (positional >= len(AI_FUNCTION_ARGS) or args.vararg)):
+            checker.problems.append(f"'{function_name}' must accept {len(AI_FUNCTION_ARGS)} arguments ({', '.join(AI_FUNCTION_ARGS)})")
+    return checker.problems
+
 # --- Helper: Dynamic Logic Loading ---
+# Loaded AI callables keyed by (sha256 of the file's bytes, function name), at most LOGIC_CACHE_SIZE in
+# least recently used order. Identical files share one module, and a file is only recompiled when its contents change.
+_logic_cache: Dict[Tuple[str, str], Callable] = {}
+logic_code_cache_dir: Optional[str] = None # If set, compiled code objects are also marshalled here
+
+def _prune_logic_code_cache(keep: int = LOGIC_CODE_CACHE_MAX_FILES):
+    # Deletes the least recently used compiled code files (by mtime, refreshed on every hit) beyond `keep`.
+    try:
+        entries = [entry for entry in os.scandir(logic_code_cache_dir) if entry.name.endswith('.marshal')]
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass # Already removed by another worker
+
+def _compile_logic_source(source: bytes, digest: str, filepath: str) -> CodeType:
+    cache_path = None
+    if logic_code_cache_dir:
+        cache_path = os.path.join(logic_code_cache_dir, f"{digest}.{sys.implementation.cache_tag}.marshal")
+        try:
+            with open(cache_path, 'rb') as f:
+                code = marshal.load(f)
+            os.utime(cache_path) # Mark as recently used for _prune_logic_code_cache
+            return code
+        except (OSError, EOFError, ValueError, TypeError):
+            pass # Missing or unreadable entry: compile below
+    code = compile(source, filepath, 'exec')
+    if cache_path:
+        try:
+            os.makedirs(logic_code_cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(code, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write compiled logic cache {cache_path}: {e}")
+        _prune_logic_code_cache()
+    return code
+
+def file_sha256(filepath: str) -> Optional[str]:
+    try:
+        with open(filepath, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
 def load_logic_from_file(filepath: str, function_name: str) -> Optional[Callable]:
     if not os.path.exists(filepath):
         print(f"Error: Logic file not found: {filepath}")
         return None
     try:
-        module_name = f"snake_logic_module_{os.path.basename(filepath).replace('.py', '')}_{function_name}_{random.randint(1000,9999)}"
-        spec = importlib.util.spec_from_file_location(module_name, filepath)
-        if spec is None or spec.loader is None: 
-            print(f"Error: Could not create spec for {filepath}")
+        with open(filepath, 'rb') as f:
+            source = f.read()
+        digest = hashlib.sha256(source).hexdigest()
+        cached = _logic_cache.pop((digest, function_name), None) # Re-inserted as most recently used
+        if cached is not None:
+            _logic_cache[(digest, function_name)] = cached
+            return cached
+        problems = validate_logic_source(source, filepath, function_name)
+        if problems:
+            print(f"Error: Rejected logic in {filepath} before loading: {'; '.join(problems)}")
             return None
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module) 
-        return getattr(module, function_name)
+        module_name = f"snake_logic_module_{os.path.basename(filepath).replace('.py', '')}_{digest[:12]}"
+        module = ModuleType(module_name)
+        module.__file__ = filepath
+        try:
+            call_with_deadline(exec, LOGIC_LOAD_TIMEOUT, _compile_logic_source(source, digest, filepath), module.__dict__)
+        except MoveTimeout:
+            print(f"Error loading logic from {filepath}: module code ran longer than {LOGIC_LOAD_TIMEOUT:g} s")
+            return None
+        logic = getattr(module, function_name)
+        _logic_cache[(digest, function_name)] = logic
+        while len(_logic_cache) > LOGIC_CACHE_SIZE:
+            _logic_cache.pop(next(iter(_logic_cache)))
+        return logic
     except Exception as e:
         print(f"Error loading logic from {filepath}: {e}")
         return None
@@ -199,24 +746,228 @@ def extract_llm_response_data(llm_response_text: str) -> Optional[Tuple[str, str
     print("LLM Response was:\n", llm_response_text[:1000] + "..." if len(llm_response_text) > 1000 else llm_response_text)
     return None
 
-# --- LLM Code Generation Function (Now using Groq) ---
-def generate_challenger_code_with_llm(api_key: str, current_best_code: str, snake_api_docs: str, game_constants_docs: str, generation: int) -> Optional[Tuple[str, str]]:
-    if not Groq:
-        print("Error: groq library is not installed. Cannot generate code with LLM.")
-        print("Please install it: pip install groq")
+# --- LLM Providers ---
+GROQ_MODEL = "llama-3.1-8b-instant" # Using a generally available powerful model on Groq. User's prompt had "qwen-qwq-32b" which might be specific.
+GROQ_MAX_TOKENS = 131072
+
+class LLMProvider:
+    """Sends a single-message chat prompt to an LLM and returns the response text (None on failure).
+
+    Providers are created once and reused for every generation; they must be safe to call from
+    several threads at once (prefetching and multi-candidate requests do that).
+    """
+    label = "LLM"
+
+    def complete(self, prompt: str) -> Optional[str]:
+        raise NotImplementedError
+
+class GroqProvider(LLMProvider):
+    # Groq chat completions through one shared client and retries with exponential backoff.
+    label = "Groq"
+
+    def __init__(self, api_key: str, model: str = GROQ_MODEL, max_tokens: int = GROQ_MAX_TOKENS,
+                 temperature: float = 0.8, top_p: float = 0.9, max_retries: int = 3, backoff_s: float = 2.0):
+        if not Groq:
+            raise RuntimeError("groq library is not installed. Please install it: pip install groq")
+        self.api_key, self.model, self.max_tokens = api_key, model, max_tokens
+        self.temperature, self.top_p = temperature, top_p
+        self.max_retries, self.backoff_s = max_retries, backoff_s
+        # The Groq client is thread-safe and keeps an HTTP connection pool, so the candidate threads of every
+        # generation share one instead of each short-lived thread opening its own connections.
+        self._client_lock = threading.Lock()
+        self._shared_client = None
+
+    def _client(self):
+        with self._client_lock:
+            if self._shared_client is None:
+                self._shared_client = Groq(api_key=self.api_key)
+            return self._shared_client
+
+    def complete(self, prompt: str) -> Optional[str]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                completion = self._client().chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=self.temperature, # Slightly higher for more creativity
+                    max_tokens=self.max_tokens,
+                    top_p=self.top_p,
+                    stream=False,
+                    response_format={"type": "json_object"}
+                )
+                if completion.choices and completion.choices[0].message and completion.choices[0].message.content:
+                    return completion.choices[0].message.content
+                print("Error: Groq LLM response did not contain expected content.")
+                if completion.usage: print(f"Usage: {completion.usage}")
+                return None
+            except Exception as e:
+                print(f"Error during Groq LLM call (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
+                if hasattr(e, 'response') and e.response:
+                    try:
+                        error_details = e.response.json()
+                        print(f"Groq API Error Details: {error_details}")
+                    except:
+                        print(f"Groq API Error Response (text): {e.response.text}")
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                if status is not None and 400 <= status < 500 and status not in (408, 429):
+                    return None # Bad request or auth: retrying will not help
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff_s * 2 ** attempt * (0.5 + random.random())) # Jittered exponential backoff
         return None
 
-    print(f"\n--- Attempting to generate Challenger Snake Logic (Generation {generation}) with Groq LLM ---")
-    
-    model_name = "llama-3.1-8b-instant" # Using a generally available powerful model on Groq. User's prompt had "qwen-qwq-32b" which might be specific.
-
+class MockLLMProvider(LLMProvider):
+    """Offline, deterministic stand-in for an LLM: answers with archived champions, some of them mutated.
+
+    Response k (counting calls) is derived from `seed` and k alone: a random champion from source_dir
+    that passes validate_logic_source, returned as-is ("canned") or with a few numeric constants nudged.
+    Lets the whole evolution loop run and be benchmarked without network access or an API key.
+    """
+    label = "mock"
+
+    def __init__(self, source_dir: str = PAST_CHAMPIONS_DIR, seed: int = 0, latency_s: float = 0.0,
+                 mutation_rate: float = 0.75):
+        self.sources: List[Tuple[str, str]] = []
+        for filename in sorted(os.listdir(source_dir)) if os.path.isdir(source_dir) else []:
+            if not filename.endswith('.py'): continue
+            with open(os.path.join(source_dir, filename)) as f:
+                code = f.read()
+            if not validate_logic_source(code, filename):
+                self.sources.append((filename[:-3], code))
+        self.seed, self.latency_s, self.mutation_rate = seed, latency_s, mutation_rate
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def complete(self, prompt: str) -> Optional[str]:
+        with self.lock:
+            call_idx = self.calls
+            self.calls += 1
+        time.sleep(self.latency_s)
+        if not self.sources: return None
+        rng = random.Random(f"{self.seed}:{call_idx}")
+        base_name, code = rng.choice(self.sources)
+        name = f"Mock{call_idx}_" + re.sub(r'_Gen\d+$', '', base_name)
+        if rng.random() < self.mutation_rate:
+            code = self._mutate(code, rng)
+            name += "_Mutant"
+        return json.dumps({"challenger_name": name, "python_code": code})
+
+    @staticmethod
+    def _mutate(code: str, rng: random.Random) -> str:
+        # Nudges one to three numeric constants inside functions (weights, thresholds, depths).
+        tree = ast.parse(code)
+        constants = [node for func in ast.walk(tree) if isinstance(func, ast.FunctionDef)
+                     for node in ast.walk(func) if isinstance(node, ast.Constant)
+                     and type(node.value) in (int, float) and node.value not in (0, 1, -1)]
+        constants = list({id(node): node for node in constants}.values()) # Nested functions are walked twice
+        for node in rng.sample(constants, min(len(constants), rng.randint(1, 3))):
+            if isinstance(node.value, int):
+                node.value = max(2, node.value + rng.choice((-1, 1)) * max(1, abs(node.value) // 5))
+            else:
+                node.value = round(node.value * rng.uniform(0.7, 1.3), 4)
+        return ast.unparse(tree) + "\n"
+
+def create_llm_provider(provider_name: str, api_key: Optional[str] = None, model: str = GROQ_MODEL,
+                        max_tokens: int = GROQ_MAX_TOKENS, mock_latency_s: float = 0.0, seed: int = SEED) -> Optional[LLMProvider]:
+    if provider_name == "mock":
+        return MockLLMProvider(PAST_CHAMPIONS_DIR, seed, mock_latency_s)
+    if not api_key:
+        print("WARNING: Groq API key not provided. LLM generation SKIPPED.")
+        return None
     try:
-        client = Groq(api_key=api_key)
-    except Exception as e:
-        print(f"Error initializing Groq client: {e}")
+        return GroqProvider(api_key, model, max_tokens)
+    except RuntimeError as e:
+        print(f"CRITICAL: {e}. LLM generation SKIPPED.")
         return None
 
-    full_prompt = f"""
+# --- LLM Prompt Building ---
+LLM_PROMPT_TOKEN_BUDGET = 6000 # Prompt size cap; the champion's code is truncated if it does not fit
+_token_encoding = None
+
+def count_tokens(text: str) -> int:
+    # Exact with tiktoken (cl100k_base is close enough for Llama-style tokenizers), ~4 characters per token otherwise.
+    global _token_encoding
+    if tiktoken and _token_encoding is None:
+        try:
+            _token_encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception: # The encoding is downloaded on first use; offline runs fall back to the estimate
+            _token_encoding = False
+    if _token_encoding:
+        return len(_token_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+def _is_main_guard(test: ast.expr) -> bool:
+    # Exactly `__name__ == "__main__"`; other tests on __name__ can be true for a loaded module.
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == '__name__'
+            and len(test.ops) == 1 and isinstance(test.ops[0], ast.Eq)
+            and isinstance(test.comparators[0], ast.Constant) and test.comparators[0].value == "__main__")
+
+class _DeadCodeStripper(ast.NodeTransformer):
+    # Removes docstrings, bare string "comments", `if False:`-style branches and statements after return/raise/break/continue.
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        for field in ('body', 'orelse', 'finalbody'):
+            stmts = getattr(node, field, None)
+            if isinstance(stmts, list) and stmts and isinstance(stmts[0], ast.stmt):
+                pruned = self._prune(stmts)
+                setattr(node, field, pruned if pruned or field != 'body' else [ast.Pass()])
+        return node
+
+    @staticmethod
+    def _prune(stmts: List[ast.stmt]) -> List[ast.stmt]:
+        pruned = []
+        for stmt in stmts:
+            if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant) and isinstance(stmt.value.value, str):
+                continue
+            if isinstance(stmt, ast.If) and isinstance(stmt.test, ast.Constant):
+                pruned.extend(stmt.body if stmt.test.value else stmt.orelse)
+                continue
+            if isinstance(stmt, ast.If) and _is_main_guard(stmt.test):
+                pruned.extend(stmt.orelse) # `if __name__ == "__main__":` never runs when the logic is loaded
+                continue
+            pruned.append(stmt)
+            if isinstance(stmt, (ast.Return, ast.Raise, ast.Break, ast.Continue)):
+                break
+        return pruned
+
+def strip_champion_source(source: str, function_name: str = "get_challenger_action") -> str:
+    """Returns source without comments, docstrings, dead branches and top-level functions/classes that
+    function_name never reaches. Behaviour is unchanged; unparsable source is returned as-is."""
+    try:
+        tree = _DeadCodeStripper().visit(ast.parse(source))
+    except (SyntaxError, ValueError, RecursionError):
+        return source
+    definition_types = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    definitions = {node.name: node for node in tree.body if isinstance(node, definition_types)}
+    if function_name in definitions:
+        # Module-level statements (constants, tables of handlers) always run, so names they use are kept too
+        pending = [function_name] + [node.id for stmt in tree.body if not isinstance(stmt, definition_types)
+                                     for node in ast.walk(stmt) if isinstance(node, ast.Name)]
+        reachable = set()
+        while pending:
+            name = pending.pop()
+            if name in reachable or name not in definitions: continue
+            reachable.add(name)
+            pending.extend(node.id for node in ast.walk(definitions[name]) if isinstance(node, ast.Name))
+        tree.body = [stmt for stmt in tree.body if not (isinstance(stmt, definition_types) and stmt.name not in reachable)]
+    return ast.unparse(tree) + "\n"
+
+class PromptBuilder:
+    """Builds the challenger prompt for the LLM within a token budget.
+
+    Everything except the champion's code (rules, API docs, response format) is the static prefix: it is
+    built once and sent byte-for-byte identical every generation, so providers with prompt caching can
+    reuse it. The champion's code goes last, stripped by strip_champion_source and cut to the budget.
+    """
+
+    def __init__(self, snake_api_docs: str, game_constants_docs: str, token_budget: int = LLM_PROMPT_TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self.prefix = self._static_prefix(snake_api_docs, game_constants_docs)
+        self.prefix_tokens = count_tokens(self.prefix)
+        self._champion_sections: Dict[str, Tuple[str, int, int]] = {} # Code -> (section, original code tokens, sent code tokens)
+
+    @staticmethod
+    def _static_prefix(snake_api_docs: str, game_constants_docs: str) -> str:
+        return f"""
 You are an expert Python programmer developing an AI for a 1v1 Snake game.
 Your goal is to write the logic for a new challenger snake. If your snake performs well against the current champion(s), its code will become the new champion.
 
@@ -237,10 +988,6 @@ Objectives (in order):
 2.  Eat Food: Grow longer.
 3.  Outmaneuver Opponent: Aggressive (trapping) or defensive strategies. Longer snakes win head-on. Equal length head-on means both die.
 
-The current champion snake's logic (whose code is in `best_snake_logic.py` and you must try to defeat) is:
-```python
-{current_best_code}
-```
 You will be playing against a gauntlet of top snakes. Your goal is to beat them all.
 
 IMPORTANT INSTRUCTIONS FOR YOUR RESPONSE:
@@ -260,42 +1007,136 @@ Example JSON response format:
 - The function signature in your code MUST be `def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_height):`.
 - Return one of the action indices: 0 (Up), 1 (Right), 2 (Down), or 3 (Left).
 - Strive to return a valid action from `my_snake.get_valid_actions()`.
+- Only import these modules: {', '.join(sorted(ALLOWED_LOGIC_IMPORTS))} (plus `from main_snake_game import` {', '.join(sorted(ALLOWED_GAME_IMPORTS))}). Do not read or write files, use the network, call `eval`/`exec`/`getattr`, use names starting with `_` from imported modules, or loop at module level; such code is rejected before it runs.
 """
-    messages = [{"role": "user", "content": full_prompt}]
-
-    print(f"Sending prompt to Groq LLM (model: {model_name})...")
-    try:
-        completion = client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            temperature=0.8, # Slightly higher for more creativity
-            max_tokens=131072,
-            top_p=0.9,
-            stream=False,
-            response_format={"type": "json_object"}
-        )
-        
-        if completion.choices and completion.choices[0].message and completion.choices[0].message.content:
-            llm_response_text = completion.choices[0].message.content
-            print("Groq LLM response received.")
-            return extract_llm_response_data(llm_response_text)
-        else:
-            print("Error: Groq LLM response did not contain expected content.")
-            if completion.usage: print(f"Usage: {completion.usage}")
-            return None
 
-    except Exception as e:
-        print(f"Error during Groq LLM call: {e}")
-        if hasattr(e, 'response') and e.response:
-            try:
-                error_details = e.response.json()
-                print(f"Groq API Error Details: {error_details}")
-            except:
-                print(f"Groq API Error Response (text): {e.response.text}")
+    def _champion_section(self, current_best_code: str) -> Tuple[str, int, int]:
+        # The champion rarely changes between generations, so its compressed section is computed once per code
+        cached = self._champion_sections.get(current_best_code)
+        if cached: return cached
+        header = "\nThe current champion snake's logic (whose code is in `best_snake_logic.py` and you must try to defeat) is:\n```python\n"
+        footer = "```\nRespond with the JSON object described above.\n"
+        marker = "# ... (rest of the champion's code omitted to fit the prompt budget)\n"
+        code = strip_champion_source(current_best_code)
+        original_tokens, code_tokens = count_tokens(current_best_code), count_tokens(code)
+        if code_tokens > original_tokens: # Nothing to strip; unparsing only reformatted it
+            code, code_tokens = current_best_code, original_tokens
+        section = header + code + footer
+        available = self.token_budget - self.prefix_tokens
+        if count_tokens(section) > available:
+            lines = code.splitlines(keepends=True)
+            lo, hi = 0, len(lines) # Longest prefix of lines that still fits, found by bisection
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if count_tokens(header + ''.join(lines[:mid]) + marker + footer) <= available: lo = mid
+                else: hi = mid - 1
+            section = header + ''.join(lines[:lo]) + marker + footer
+            code_tokens = count_tokens(''.join(lines[:lo]))
+        result = (section, original_tokens, code_tokens)
+        if len(self._champion_sections) >= 8: self._champion_sections.clear()
+        self._champion_sections[current_best_code] = result
+        return result
+
+    def build(self, current_best_code: str) -> str:
+        section, original_tokens, code_tokens = self._champion_section(current_best_code)
+        prompt = self.prefix + section
+        print(f"Prompt: ~{count_tokens(prompt)} tokens (budget {self.token_budget}); "
+              f"champion code {original_tokens} -> {code_tokens} tokens.")
+        return prompt
+
+# --- LLM Code Generation Function ---
+def generate_challenger_code_with_llm(provider: LLMProvider, prompt_builder: PromptBuilder, current_best_code: str, generation: int) -> Optional[Tuple[str, str]]:
+    print(f"\n--- Attempting to generate Challenger Snake Logic (Generation {generation}) with {provider.label} LLM ---")
+
+    full_prompt = prompt_builder.build(current_best_code)
+
+    print(f"Sending prompt to {provider.label} LLM...")
+    llm_response_text = provider.complete(full_prompt)
+    if llm_response_text is None:
+        print(f"{provider.label} LLM call failed.")
         return None
+    print(f"{provider.label} LLM response received.")
+    return extract_llm_response_data(llm_response_text)
+
+def generate_challenger_candidates(generate_fn: Callable[[str, int], Optional[Tuple[str, str]]], current_best_code: str,
+                                   generation: int, count: int) -> List[Tuple[str, str]]:
+    # Makes `count` LLM requests in parallel for one prompt; failed ones are left out.
+    if count <= 1:
+        candidate = generate_fn(current_best_code, generation)
+        return [candidate] if candidate else []
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        candidates = list(pool.map(lambda _: generate_fn(current_best_code, generation), range(count)))
+    return [candidate for candidate in candidates if candidate]
+
+class ChallengerPrefetcher:
+    """Keeps up to `depth` batches of challenger candidates generated ahead of the gauntlet on a background thread.
+
+    generate_fn(current_best_code, generation) is the (slow, network-bound) LLM call returning a list of
+    candidates. Batches are built for the champion code passed to get(); a different champion invalidates
+    everything queued or in flight. With depth 0 get() simply calls generate_fn. A batch whose generate_fn
+    raised is reported and comes back as an empty list, so get() never waits on a dead thread.
+    """
+    def __init__(self, generate_fn: Callable[[str, int], List[Any]], depth: int = 1):
+        self.generate_fn = generate_fn
+        self.depth = depth
+        self.condition = threading.Condition()
+        self.ready: deque = deque() # generate_fn results for the current context
+        self.context: Optional[str] = None
+        self.epoch = 0 # Bumped whenever the context changes
+        self.next_generation = 0
+        self.thread: Optional[threading.Thread] = None
+
+    def _generate(self, current_best_code: str, generation: int) -> List[Any]:
+        try:
+            return self.generate_fn(current_best_code, generation)
+        except Exception as e:
+            print(f"Error: Challenger generation for Generation {generation} failed: {e}")
+            return []
+
+    def get(self, current_best_code: str, generation: int) -> List[Any]:
+        if self.depth <= 0:
+            return self._generate(current_best_code, generation)
+        with self.condition:
+            if current_best_code != self.context:
+                if self.context is not None: print("Champion changed: discarding prefetched challenger candidates.")
+                self.context = current_best_code
+                self.epoch += 1
+                self.ready.clear()
+                self.next_generation = generation
+                self.condition.notify_all()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="challenger-prefetch", daemon=True)
+                self.thread.start()
+            while not self.ready:
+                self.condition.wait()
+            candidate = self.ready.popleft()
+            self.condition.notify_all() # Room for the next prefetch
+            return candidate
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while len(self.ready) >= self.depth:
+                    self.condition.wait()
+                epoch, context, generation = self.epoch, self.context, self.next_generation
+                self.next_generation += 1
+            candidate = self._generate(context, generation)
+            with self.condition:
+                if epoch == self.epoch: # Otherwise the champion changed while this was being generated
+                    self.ready.append(candidate)
+                    self.condition.notify_all()
 
 class SnakeEnvironment:
-    def __init__(self):
+    SNAKE1_BIT, SNAKE2_BIT = 1, 2 # Owner bits on the occupancy grid
+
+    def __init__(self, config: GameConfig = DEFAULT_GAME_CONFIG, use_occupancy_grid: bool = True,
+                 rng: Optional[random.Random] = None):
+        # With use_occupancy_grid, body collision checks and food placement read a shared
+        # bytearray instead of scanning the snakes' deques. Spawns and food are drawn from rng
+        # (the global random stream if None); play_game gives seeded games their own.
+        self.config = config
+        self.rng = rng or random
+        self.occupancy: Optional[OccupancyGrid] = OccupancyGrid(config.grid_width, config.grid_height) if use_occupancy_grid else None
         self.snake1: Optional[Snake] = None
         self.snake2: Optional[Snake] = None
         self.foods: List[Food] = []
@@ -306,41 +1147,63 @@ class SnakeEnvironment:
         self.steps_taken = 0
         self.game_over = False
         
+        config, rng = self.config, self.rng
+        width, height = config.grid_width, config.grid_height
         while True:
-            pos1 = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            dir1_idx = random.choice(Snake.ACTIONS_LIST)
-            self.snake1 = Snake(*pos1, initial_direction_idx=dir1_idx)
+            pos1 = (rng.randint(0, width - 1), rng.randint(0, height - 1))
+            dir1_idx = rng.choice(Snake.ACTIONS_LIST)
+            self.snake1 = Snake(*pos1, initial_direction_idx=dir1_idx, config=config)
 
-            pos2 = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            while any(p in self.snake1.positions for p in Snake(*pos2, initial_direction_idx=random.choice(Snake.ACTIONS_LIST)).positions): # Check full initial body
-                 pos2 = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
+            pos2 = (rng.randint(0, width - 1), rng.randint(0, height - 1))
+            while any(p in self.snake1.positions for p in Snake(*pos2, initial_direction_idx=rng.choice(Snake.ACTIONS_LIST), config=config).positions): # Check full initial body
+                 pos2 = (rng.randint(0, width - 1), rng.randint(0, height - 1))
             
-            dir2_idx = random.choice(Snake.ACTIONS_LIST)
-            temp_snake2_for_check = Snake(*pos2, initial_direction_idx=dir2_idx)
+            dir2_idx = rng.choice(Snake.ACTIONS_LIST)
+            temp_snake2_for_check = Snake(*pos2, initial_direction_idx=dir2_idx, config=config)
 
             if pos1 == pos2 and dir1_idx == Snake.OPPOSITE_ACTIONS_MAP[dir2_idx]:
                  valid_dirs = [d for d in Snake.ACTIONS_LIST if d != Snake.OPPOSITE_ACTIONS_MAP[dir1_idx]]
-                 dir2_idx = random.choice(valid_dirs) if valid_dirs else dir2_idx 
-                 temp_snake2_for_check = Snake(*pos2, initial_direction_idx=dir2_idx)
+                 dir2_idx = rng.choice(valid_dirs) if valid_dirs else dir2_idx 
+                 temp_snake2_for_check = Snake(*pos2, initial_direction_idx=dir2_idx, config=config)
 
 
             if not any(p2_seg in self.snake1.positions for p2_seg in temp_snake2_for_check.positions):
                  self.snake2 = temp_snake2_for_check # Assign the validated snake
                  break 
 
+        if self.occupancy is not None:
+            self.occupancy.clear()
+            self.snake1.attach_occupancy(self.occupancy, self.SNAKE1_BIT)
+            self.snake2.attach_occupancy(self.occupancy, self.SNAKE2_BIT)
+
         self.foods = []
         self._spawn_food()
         return self.snake1, self.snake2, self.foods
 
     def _spawn_food(self):
         if len(self.foods) > 0: return 
+        rng = self.rng
+        if self.occupancy is not None:
+            alive_mask = 0
+            if self.snake1 and self.snake1.is_alive: alive_mask |= self.SNAKE1_BIT
+            if self.snake2 and self.snake2.is_alive: alive_mask |= self.SNAKE2_BIT
+            if alive_mask == self.SNAKE1_BIT | self.SNAKE2_BIT:
+                food_pos = self.occupancy.random_free_cell(self.rng) # O(1) draw from the free-cell index
+                if food_pos is not None:
+                    self.foods.append(Food(food_pos))
+                return
+            # A snake died this step: its cells count as empty, so scan the grid (only happens on a game's last step).
+            empty_cells = self.occupancy.empty_cells(alive_mask)
+            if empty_cells:
+                self.foods.append(Food(rng.choice(empty_cells)))
+            return
         occupied_cells = set()
         if self.snake1 and self.snake1.is_alive: occupied_cells.update(self.snake1.positions)
         if self.snake2 and self.snake2.is_alive: occupied_cells.update(self.snake2.positions)
         
-        empty_cells = [(x, y) for x in range(GRID_WIDTH) for y in range(GRID_HEIGHT) if (x,y) not in occupied_cells]
+        empty_cells = [(x, y) for x in range(self.config.grid_width) for y in range(self.config.grid_height) if (x,y) not in occupied_cells]
         if empty_cells:
-            self.foods.append(Food(random.choice(empty_cells)))
+            self.foods.append(Food(rng.choice(empty_cells)))
 
     def step(self, action1: int, action2: int) -> Tuple[bool, bool, bool]: 
         if self.game_over:
@@ -362,6 +1225,12 @@ class SnakeEnvironment:
                 else: 
                     s1_killed_by_s2 = True; self.snake1.is_alive = False
                     s2_killed_by_s1 = True; self.snake2.is_alive = False
+            elif self.occupancy is not None:
+                # Heads differ, so an owner bit on the other snake's head cell means a body hit.
+                if self.occupancy.is_occupied(head1, self.SNAKE2_BIT):
+                    s1_killed_by_s2 = True; self.snake1.is_alive = False
+                if self.snake2.is_alive and self.occupancy.is_occupied(head2, self.SNAKE1_BIT):
+                    s2_killed_by_s1 = True; self.snake2.is_alive = False
             else:
                 if head1 in list(self.snake2.positions)[1:]: 
                     s1_killed_by_s2 = True; self.snake1.is_alive = False
@@ -385,14 +1254,182 @@ class SnakeEnvironment:
 
         s1_truly_alive = self.snake1 and self.snake1.is_alive
         s2_truly_alive = self.snake2 and self.snake2.is_alive
-        if not s1_truly_alive or not s2_truly_alive or self.steps_taken >= MAX_STEPS_PER_EPISODE:
+        if not s1_truly_alive or not s2_truly_alive or self.steps_taken >= self.config.max_steps_per_episode:
             self.game_over = True
         
         return self.game_over, snake1_killed_this_step, snake2_killed_this_step
 
+class BatchSnakeEnvironment:
+    """Steps `num_games` independent games at once with NumPy, using the same rules as SnakeEnvironment.step.
+
+    Cells are x-major indices (x * grid_height + y). Each snake body is a ring buffer of cells in
+    `bodies[game, snake]` with the head at `head_ptr` and `counts` segments following it; `occupancy`
+    holds the same per-cell owner bits as OccupancyGrid. Snake 0 is the challenger, snake 1 the opponent.
+    """
+    SNAKE_BITS = (SnakeEnvironment.SNAKE1_BIT, SnakeEnvironment.SNAKE2_BIT)
+
+    def __init__(self, num_games: int, seed: Optional[int] = None, config: GameConfig = DEFAULT_GAME_CONFIG):
+        if np is None:
+            raise RuntimeError("numpy is not installed. BatchSnakeEnvironment requires it: pip install numpy")
+        if config.initial_snake_length > min(config.grid_width, config.grid_height):
+            raise ValueError("BatchSnakeEnvironment requires initial_snake_length <= min(grid_width, grid_height).")
+        self.config = config
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        self.capacity = max(config.max_snake_length, config.initial_snake_length)
+        self.dx = np.array([dx for dx, _ in Snake.DIRECTIONS_MAP], dtype=np.int32)
+        self.dy = np.array([dy for _, dy in Snake.DIRECTIONS_MAP], dtype=np.int32)
+
+        self.bodies = np.zeros((num_games, 2, self.capacity), dtype=np.int32)
+        self.head_ptr = np.zeros((num_games, 2), dtype=np.int32)
+        self.counts = np.zeros((num_games, 2), dtype=np.int32)
+        self.lengths = np.zeros((num_games, 2), dtype=np.int32)
+        self.scores = np.zeros((num_games, 2), dtype=np.int32)
+        self.directions = np.zeros((num_games, 2), dtype=np.int32)
+        self.alive = np.zeros((num_games, 2), dtype=bool)
+        self.food = np.full(num_games, -1, dtype=np.int32) # -1 means no food on the board
+        self.steps_taken = np.zeros(num_games, dtype=np.int32)
+        self.game_over = np.ones(num_games, dtype=bool)
+        self.occupancy = np.zeros((num_games, config.grid_width * config.grid_height), dtype=np.uint8)
+
+    def reset(self):
+        n, length0 = self.num_games, self.config.initial_snake_length
+        width, height = self.config.grid_width, self.config.grid_height
+        segment_offsets = np.arange(length0, dtype=np.int32)
+        self.bodies[:] = 0
+        pending = np.ones(n, dtype=bool)
+        while pending.any(): # Resample starting spots for games where the two bodies overlap
+            games = np.flatnonzero(pending)
+            xs = self.rng.integers(0, width, (games.size, 2))
+            ys = self.rng.integers(0, height, (games.size, 2))
+            dirs = self.rng.integers(0, len(Snake.ACTIONS_LIST), (games.size, 2))
+            body_x = (xs[..., None] - self.dx[dirs][..., None] * segment_offsets) % width
+            body_y = (ys[..., None] - self.dy[dirs][..., None] * segment_offsets) % height
+            cells = body_x * height + body_y # (games, 2, length0), head first
+            clash = (cells[:, 0, :, None] == cells[:, 1, None, :]).any(axis=(1, 2))
+            ok = ~clash
+            placed = games[ok]
+            self.bodies[placed, :, :length0] = cells[ok]
+            self.directions[placed] = dirs[ok]
+            pending[placed] = False
+
+        self.head_ptr[:] = 0
+        self.counts[:] = length0
+        self.lengths[:] = length0
+        self.scores[:] = 0
+        self.alive[:] = True
+        self.steps_taken[:] = 0
+        self.game_over[:] = False
+        self.occupancy[:] = 0
+        all_games = np.arange(n)[:, None]
+        for s, bit in enumerate(self.SNAKE_BITS):
+            self.occupancy[all_games, self.bodies[:, s, :length0]] |= bit
+        self.food[:] = -1
+        self._spawn_food(np.arange(n))
+
+    def _spawn_food(self, games):
+        if games.size == 0: return
+        alive_mask = (self.alive[games, 0] * self.SNAKE_BITS[0] | self.alive[games, 1] * self.SNAKE_BITS[1]).astype(np.uint8)
+        occupied = (self.occupancy[games] & alive_mask[:, None]) != 0
+        # Uniform choice among empty cells: the largest random key wins, occupied cells never do.
+        keys = self.rng.random(occupied.shape)
+        keys[occupied] = -1.0
+        self.food[games] = np.where(occupied.all(axis=1), -1, keys.argmax(axis=1))
+
+    def heads(self):
+        return self.bodies[np.arange(self.num_games)[:, None], np.arange(2)[None, :], self.head_ptr]
+
+    def step(self, actions1, actions2):
+        # Returns (game_over, snake1_killed_this_step, snake2_killed_this_step) as boolean arrays.
+        actions = np.stack([np.asarray(actions1, dtype=np.int32), np.asarray(actions2, dtype=np.int32)], axis=1)
+        active = ~self.game_over
+        killed = np.zeros((self.num_games, 2), dtype=bool)
+        self.steps_taken[active] += 1
+
+        width, height = self.config.grid_width, self.config.grid_height
+        heads = self.heads()
+        for s, bit in enumerate(self.SNAKE_BITS):
+            movers = np.flatnonzero(active & self.alive[:, s])
+            if movers.size == 0: continue
+            direction = actions[movers, s]
+            self.directions[movers, s] = direction
+            head = heads[movers, s]
+            new_head = ((head // height + self.dx[direction]) % width) * height \
+                       + (head % height + self.dy[direction]) % height
+            tail = self.bodies[movers, s, (self.head_ptr[movers, s] + self.counts[movers, s] - 1) % self.capacity]
+            drops_tail = self.counts[movers, s] >= self.lengths[movers, s]
+
+            # Self-collision, with the tail cell free if it is about to move away
+            hit_self = ((self.occupancy[movers, new_head] & bit) != 0) & ~(drops_tail & (new_head == tail))
+            self.alive[movers[hit_self], s] = False
+            killed[movers[hit_self], s] = True
+
+            moved = ~hit_self
+            movers, new_head, drops_tail, tail = movers[moved], new_head[moved], drops_tail[moved], tail[moved]
+            shrinking = movers[drops_tail]
+            self.occupancy[shrinking, tail[drops_tail]] &= np.uint8(0xFF ^ bit)
+            self.counts[shrinking, s] -= 1
+            new_ptr = (self.head_ptr[movers, s] - 1) % self.capacity
+            self.head_ptr[movers, s] = new_ptr
+            self.bodies[movers, s, new_ptr] = new_head
+            self.occupancy[movers, new_head] |= bit
+            self.counts[movers, s] += 1
+
+        heads = self.heads()
+        head1, head2 = heads[:, 0], heads[:, 1]
+        rows = np.arange(self.num_games)
+        both_alive = active & self.alive[:, 0] & self.alive[:, 1]
+        head_on = both_alive & (head1 == head2)
+        kill1 = head_on & (self.lengths[:, 0] <= self.lengths[:, 1])
+        kill2 = head_on & (self.lengths[:, 1] <= self.lengths[:, 0])
+        apart = both_alive & (head1 != head2)
+        kill1 |= apart & ((self.occupancy[rows, head1] & self.SNAKE_BITS[1]) != 0)
+        kill2 |= apart & ((self.occupancy[rows, head2] & self.SNAKE_BITS[0]) != 0)
+        self.alive[kill1, 0] = False
+        self.alive[kill2, 1] = False
+        killed[:, 0] |= kill1
+        killed[:, 1] |= kill2
+
+        has_food = active & (self.food >= 0)
+        eat1 = has_food & self.alive[:, 0] & (head1 == self.food)
+        eat2 = has_food & ~eat1 & self.alive[:, 1] & (head2 == self.food)
+        for s, eaters in enumerate((eat1, eat2)):
+            self.lengths[eaters, s] = np.minimum(self.lengths[eaters, s] + 1, self.config.max_snake_length)
+            self.scores[eaters, s] += 1
+        ate = eat1 | eat2
+        self.food[ate] = -1
+        self._spawn_food(np.flatnonzero(ate))
+
+        self.game_over |= active & (~self.alive[:, 0] | ~self.alive[:, 1] | (self.steps_taken >= self.config.max_steps_per_episode))
+        killed[~active] = ~self.alive[~active] # Finished games report like SnakeEnvironment.step does
+        return self.game_over.copy(), killed[:, 0], killed[:, 1]
+
+    def game_results(self):
+        # Per-game result for snake 0 (the challenger): +1 win, -1 loss, 0 tie; same rules as run_match_series.
+        alive1, alive2 = self.alive[:, 0], self.alive[:, 1]
+        by_score = np.sign(self.scores[:, 0] - self.scores[:, 1])
+        by_length = np.sign(self.lengths[:, 0] - self.lengths[:, 1])
+        results = np.where(alive1 & alive2, np.where(by_score != 0, by_score, by_length), by_score)
+        results = np.where(~alive1 & alive2, -1, results)
+        results = np.where(alive1 & ~alive2, 1, results)
+        return results.astype(np.int8)
+
+    def get_snake(self, game: int, snake: int) -> Snake:
+        # Materializes one snake as a regular Snake object so Python AI callables can be used on a batch.
+        ptr, count = int(self.head_ptr[game, snake]), int(self.counts[game, snake])
+        cells = np.take(self.bodies[game, snake], np.arange(ptr, ptr + count), mode='wrap')
+        return Snake.from_state([divmod(int(c), self.config.grid_height) for c in cells], int(self.directions[game, snake]),
+                                int(self.lengths[game, snake]), int(self.scores[game, snake]), bool(self.alive[game, snake]),
+                                config=self.config)
+
+    def get_foods(self, game: int) -> List[Food]:
+        food = int(self.food[game])
+        return [Food(divmod(food, self.config.grid_height))] if food >= 0 else []
+
 # --- Rendering ---
 def render_game(env: SnakeEnvironment, challenger_name: str, opponent_name: str):
-    grid = [['.' for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+    width, height = env.config.grid_width, env.config.grid_height
+    grid = [['.' for _ in range(width)] for _ in range(height)]
     if env.foods: grid[env.foods[0].position[1]][env.foods[0].position[0]] = 'F' 
 
     if env.snake2: 
@@ -410,84 +1447,249 @@ def render_game(env: SnakeEnvironment, challenger_name: str, opponent_name: str)
             grid[env.snake1.get_head_position()[1]][env.snake1.get_head_position()[0]] = char_dead
     
     os.system('cls' if os.name == 'nt' else 'clear')
-    print(f"Generation: {current_generation} | Step: {env.steps_taken}/{MAX_STEPS_PER_EPISODE}")
+    print(f"Generation: {current_generation} | Step: {env.steps_taken}/{env.config.max_steps_per_episode}")
     s1_score = env.snake1.score if env.snake1 else 'N/A'
     s2_score = env.snake2.score if env.snake2 else 'N/A'
     s1_status = "Alive" if env.snake1 and env.snake1.is_alive else "Dead"
     s2_status = "Alive" if env.snake2 and env.snake2.is_alive else "Dead"
 
     print(f"S1 (Challenger: {challenger_name}): Food {s1_score} ({s1_status}) | S2 (Opponent: {opponent_name}): Food {s2_score} ({s2_status})")
-    print('+' + '-' * GRID_WIDTH + '+')
-    for row_idx in range(GRID_HEIGHT): print('|' + ''.join(grid[row_idx]) + '|')
-    print('+' + '-' * GRID_WIDTH + '+')
+    print('+' + '-' * width + '+')
+    for row_idx in range(height): print('|' + ''.join(grid[row_idx]) + '|')
+    print('+' + '-' * width + '+')
 
 # --- Leaderboard Management ---
-leaderboard: List[Dict[str, Any]] = []
 current_generation: int = 0 
 
-def load_leaderboard():
-    global leaderboard
-    if os.path.exists(LEADERBOARD_FILE):
+def glicko_update(player: Dict[str, Any], opponent: Dict[str, Any], score: float, num_games: int) -> Tuple[float, float]:
+    # One Glicko rating period against a single opponent: num_games games worth `score` points to player.
+    # Returns the player's new (rating, rd).
+    q = math.log(10) / 400
+    g = 1 / math.sqrt(1 + 3 * q ** 2 * opponent["rd"] ** 2 / math.pi ** 2)
+    expected = 1 / (1 + 10 ** (-g * (player["rating"] - opponent["rating"]) / 400))
+    precision = 1 / player["rd"] ** 2 + q ** 2 * num_games * g ** 2 * expected * (1 - expected)
+    return (round(player["rating"] + q / precision * g * (score - num_games * expected), 2),
+            round(max(GLICKO_MIN_RD, math.sqrt(1 / precision)), 2))
+
+class LeaderboardStore:
+    """SQLite store of crowned champions and Glicko ratings, shared safely by several evolution processes.
+
+    Every change runs in an IMMEDIATE transaction, so concurrent writers queue up rather than overwrite
+    each other. Generation numbers are claimed from a counter in the store. A champion is only crowned if
+    the champion it beat still reigns. After each change the leaderboard is exported to json_export_path,
+    written atomically, for the web viewer and other readers of leaderboard.json.
+    On first use an existing leaderboard.json is imported.
+    """
+    RATING_FIELDS = ("name", "rating", "rd", "games", "wins", "losses", "ties")
+
+    def __init__(self, path: str = LEADERBOARD_DB_FILE, json_export_path: Optional[str] = LEADERBOARD_FILE):
+        directory = os.path.dirname(path)
+        if directory: os.makedirs(directory, exist_ok=True)
+        self.json_export_path = json_export_path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None) # Transactions are explicit
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL") # Readers do not block the writer
+        with self._transaction():
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS champions (
+                generation_crowned INTEGER PRIMARY KEY, name TEXT NOT NULL, file TEXT NOT NULL, code_hash TEXT)""")
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS ratings (
+                code_hash TEXT PRIMARY KEY, name TEXT NOT NULL, rating REAL NOT NULL, rd REAL NOT NULL,
+                games INTEGER NOT NULL, wins INTEGER NOT NULL, losses INTEGER NOT NULL, ties INTEGER NOT NULL) WITHOUT ROWID""")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID")
+            self._import_json_file()
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE") # Takes the write lock up front (waits up to the connect timeout)
         try:
-            with open(LEADERBOARD_FILE, 'r') as f:
-                leaderboard = json.load(f)
-            print(f"Loaded leaderboard from {LEADERBOARD_FILE}")
-        except Exception as e:
-            print(f"Error loading leaderboard: {e}. Starting fresh.")
-            leaderboard = []
-    else:
-        leaderboard = []
-
-def save_leaderboard():
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _import_json_file(self):
+        # One-time migration from the leaderboard.json earlier versions kept.
+        if self.json_export_path and os.path.exists(self.json_export_path) \
+                and not self.conn.execute("SELECT 1 FROM champions LIMIT 1").fetchone():
+            try:
+                with open(self.json_export_path) as f:
+                    entries = json.load(f)
+                for entry in entries:
+                    self.conn.execute("INSERT OR IGNORE INTO champions VALUES (?, ?, ?, ?)",
+                                      (entry["generation_crowned"], entry["name"], entry["file"],
+                                       file_sha256(os.path.join(PAST_CHAMPIONS_DIR, entry["file"]))))
+                print(f"Imported {len(entries)} leaderboard entries from {self.json_export_path}")
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Error importing leaderboard from {self.json_export_path}: {e}. Starting fresh.")
+
+    # Champions
+    def current_champion(self) -> Optional[Dict[str, Any]]:
+        # The most recently crowned champion, whose logic is in the best file.
+        row = self.conn.execute("SELECT * FROM champions ORDER BY generation_crowned DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def leaderboard(self, size: int = LEADERBOARD_SIZE) -> List[Dict[str, Any]]:
+        # Champions ranked by conservative rating (see RatingTable); the reigning champion always keeps a place.
+        rows = self.conn.execute("""SELECT c.name, c.generation_crowned, c.file, r.rating, r.rd FROM champions c
+                                    LEFT JOIN ratings r ON r.code_hash = c.code_hash""").fetchall()
+        entries = [{"name": row["name"], "generation_crowned": row["generation_crowned"], "file": row["file"],
+                    "rating": row["rating"] if row["rating"] is not None else GLICKO_INITIAL_RATING,
+                    "rd": row["rd"] if row["rd"] is not None else GLICKO_INITIAL_RD} for row in rows]
+        if not entries: return []
+        champion_entry = max(entries, key=lambda entry: entry["generation_crowned"])
+        entries.sort(key=lambda x: (-RatingTable.conservative_rating(x), -x["generation_crowned"]))
+        entries = entries[:size]
+        if champion_entry not in entries:
+            entries[-1] = champion_entry
+        return entries
+
+    def next_generation(self) -> int:
+        # Claims a generation number no other process sharing the store will get.
+        with self._transaction():
+            row = self.conn.execute("SELECT value FROM counters WHERE name = 'generation'").fetchone()
+            last_crowned = self.conn.execute("SELECT MAX(generation_crowned) FROM champions").fetchone()[0] or 0
+            generation = max(row[0] if row else 0, last_crowned) + 1
+            self.conn.execute("INSERT OR REPLACE INTO counters VALUES ('generation', ?)", (generation,))
+        return generation
+
+    def crown_champion(self, name: str, generation: int, file_basename: str, code_hash: Optional[str],
+                       expected_champion_generation: Optional[int], install: Callable[[], None]) -> bool:
+        """Records a new champion unless another process crowned one since expected_champion_generation
+        (the reign the challenger's gauntlet was set up against). install() copies the code into place
+        and runs inside the transaction, so no other process can crown at the same time; if it raises,
+        nothing is recorded."""
+        with self._transaction():
+            current = self.conn.execute("SELECT MAX(generation_crowned) FROM champions").fetchone()[0]
+            if current != expected_champion_generation:
+                print(f"Another worker crowned a champion (Gen {current}) during this gauntlet. '{name}' is not crowned.")
+                return False
+            install()
+            self.conn.execute("INSERT OR REPLACE INTO champions VALUES (?, ?, ?, ?)",
+                              (generation, name, file_basename, code_hash))
+        self.export_json()
+        return True
+
+    def export_json(self):
+        if not self.json_export_path: return
+        try:
+            tmp_path = f"{self.json_export_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.leaderboard(), f, indent=2)
+            os.replace(tmp_path, self.json_export_path) # Readers see the old or the new file, never half of one
+        except OSError as e:
+            print(f"Error exporting leaderboard to {self.json_export_path}: {e}")
+
+    # Ratings
+    def rating(self, code_hash: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT * FROM ratings WHERE code_hash = ?", (code_hash,)).fetchone()
+        return {field: row[field] for field in self.RATING_FIELDS} if row else None
+
+    def update_ratings(self, update: Callable[[Callable[[str], Optional[Dict[str, Any]]]], Dict[str, Dict[str, Any]]]):
+        # Runs update(read) in one transaction and writes back the entries it returns (by code hash), so
+        # concurrent series results are applied one after another on up-to-date ratings.
+        with self._transaction():
+            changed = update(self.rating)
+            self.conn.executemany("INSERT OR REPLACE INTO ratings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                  [(code_hash, *(entry[field] for field in self.RATING_FIELDS))
+                                   for code_hash, entry in changed.items()])
+
+    def close(self):
+        self.conn.close()
+
+class RatingTable:
+    """Glicko ratings for AI logic files, keyed by the SHA-256 of the file contents and kept in a LeaderboardStore.
+
+    Keying by contents means an archived champion, its copy in best_snake_logic.py and byte-identical
+    duplicates share one rating. Each match series is one Glicko rating period for its two players,
+    so a series' result moves the ratings by the same amount however its games were scheduled.
+    """
+
+    def __init__(self, store: LeaderboardStore):
+        self.store = store
+
+    def get(self, logic_file: str) -> Optional[Dict[str, Any]]:
+        digest = file_sha256(logic_file)
+        return self.store.rating(digest) if digest else None
+
+    @staticmethod
+    def conservative_rating(entry: Optional[Dict[str, Any]]) -> float:
+        # Rating minus two deviations: an AI must have proven its strength to rank high.
+        if not entry: return GLICKO_INITIAL_RATING - 2 * GLICKO_INITIAL_RD
+        return entry["rating"] - 2 * entry["rd"]
+
+    def record_series(self, logic_file_a: str, name_a: str, logic_file_b: str, name_b: str,
+                      wins: int, losses: int, ties: int):
+        # wins/losses/ties are from A's side. Both players are updated from each other's pre-series rating.
+        digest_a, digest_b = file_sha256(logic_file_a), file_sha256(logic_file_b)
+        num_games = wins + losses + ties
+        if not digest_a or not digest_b or digest_a == digest_b or num_games == 0: return
+
+        def update(read: Callable[[str], Optional[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+            new_player = {"rating": GLICKO_INITIAL_RATING, "rd": GLICKO_INITIAL_RD, "games": 0, "wins": 0, "losses": 0, "ties": 0}
+            player_a = dict(read(digest_a) or new_player, name=name_a)
+            player_b = dict(read(digest_b) or new_player, name=name_b)
+            rating_a = glicko_update(player_a, player_b, wins + 0.5 * ties, num_games)
+            rating_b = glicko_update(player_b, player_a, losses + 0.5 * ties, num_games)
+            for player, (rating, rd), won, lost in ((player_a, rating_a, wins, losses), (player_b, rating_b, losses, wins)):
+                player.update(rating=rating, rd=rd, games=player["games"] + num_games, wins=player["wins"] + won,
+                              losses=player["losses"] + lost, ties=player["ties"] + ties)
+            return {digest_a: player_a, digest_b: player_b}
+        self.store.update_ratings(update)
+
+def open_leaderboard_store(path: str, json_export_path: Optional[str] = LEADERBOARD_FILE) -> LeaderboardStore:
     try:
-        with open(LEADERBOARD_FILE, 'w') as f:
-            json.dump(leaderboard, f, indent=2)
-        print(f"Saved leaderboard to {LEADERBOARD_FILE}")
-    except Exception as e:
-        print(f"Error saving leaderboard: {e}")
+        return LeaderboardStore(path, json_export_path)
+    except (sqlite3.Error, OSError) as e:
+        print(f"CRITICAL: Could not open leaderboard store {path}: {e}")
+        sys.exit(1)
 
-def update_and_display_leaderboard(new_champion_name: str, generation_crowned: int, champion_code_file_basename: str):
-    global leaderboard
-    print(f"\n--- NEW OVERALL CHAMPION: {new_champion_name} (Crowned at Gen {generation_crowned}) ---")
-    
-    leaderboard = [entry for entry in leaderboard if entry["name"] != new_champion_name]
-    
-    leaderboard.append({
-        "name": new_champion_name,
-        "generation_crowned": generation_crowned,
-        "file": champion_code_file_basename 
-    })
-    
-    leaderboard.sort(key=lambda x: (-x["generation_crowned"], x["name"]))
-    leaderboard = leaderboard[:LEADERBOARD_SIZE] 
-    
+def display_leaderboard(leaderboard_list: List[Dict[str, Any]]):
     print("\n--- Top Snakes Leaderboard ---")
-    if not leaderboard:
+    if not leaderboard_list:
         print("Leaderboard is empty.")
     else:
-        for i, entry in enumerate(leaderboard):
-            print(f"{i+1}. {entry['name']} (Crowned Gen: {entry['generation_crowned']}, File: {entry['file']})")
+        for i, entry in enumerate(leaderboard_list):
+            print(f"{i+1}. {entry['name']} (Rating: {entry['rating']:.0f} +- {entry['rd']:.0f}, Crowned Gen: {entry['generation_crowned']}, File: {entry['file']})")
     print("-----------------------------\n")
-    save_leaderboard()
 
 # --- Gauntlet Opponent Selection ---
 def get_gauntlet_opponents(leaderboard_list: List[Dict[str, Any]],
                            current_best_overall_logic_file: str, 
                            name_for_current_best_file_logic: str,
                            past_champions_dir: str,
-                           max_opponents: int) -> List[Tuple[str, str]]: # (name, filepath)
+                           max_opponents: int,
+                           ratings: Optional[RatingTable] = None) -> List[Tuple[str, str]]: # (name, filepath)
     
     gauntlet_opponents_to_face = []
     
-    # Add from leaderboard first
-    for i in range(min(len(leaderboard_list), max_opponents)):
-        entry = leaderboard_list[i]
-        opponent_name = entry["name"]
-        opponent_file_path = os.path.join(past_champions_dir, entry["file"])
-        if os.path.exists(opponent_file_path):
+    if ratings is not None:
+        # The reigning champion first, then the highest-rated other archived champions. Archived files that
+        # never played a rated game are left out, unless they are on the leaderboard.
+        seen_hashes = set()
+        if os.path.exists(current_best_overall_logic_file):
+            gauntlet_opponents_to_face.append((name_for_current_best_file_logic, current_best_overall_logic_file))
+            seen_hashes.add(file_sha256(current_best_overall_logic_file))
+        leaderboard_names = {os.path.join(past_champions_dir, entry["file"]): entry["name"] for entry in leaderboard_list}
+        rated_files = [(RatingTable.conservative_rating(ratings.get(path)), path) for path in archived_logic_files(past_champions_dir)
+                       if path in leaderboard_names or ratings.get(path)]
+        for _, opponent_file_path in sorted(rated_files, key=lambda item: -item[0]):
+            if len(gauntlet_opponents_to_face) >= max_opponents: break
+            digest = file_sha256(opponent_file_path)
+            if digest in seen_hashes: continue # Same code as an opponent already in the gauntlet
+            seen_hashes.add(digest)
+            opponent_name = leaderboard_names.get(opponent_file_path, os.path.basename(opponent_file_path).replace('.py', ''))
             gauntlet_opponents_to_face.append((opponent_name, opponent_file_path))
-        else:
-            print(f"Warning: Leaderboard champion file '{opponent_file_path}' for '{opponent_name}' not found. Skipping.")
+    else:
+        # Add from leaderboard first
+        for i in range(min(len(leaderboard_list), max_opponents)):
+            entry = leaderboard_list[i]
+            opponent_name = entry["name"]
+            opponent_file_path = os.path.join(past_champions_dir, entry["file"])
+            if os.path.exists(opponent_file_path):
+                gauntlet_opponents_to_face.append((opponent_name, opponent_file_path))
+            else:
+                print(f"Warning: Leaderboard champion file '{opponent_file_path}' for '{opponent_name}' not found. Skipping.")
 
     # If gauntlet is empty (e.g., fresh leaderboard or all files missing)
     # the challenger faces the logic in current_best_overall_logic_file.
@@ -507,110 +1709,1163 @@ def get_gauntlet_opponents(leaderboard_list: List[Dict[str, Any]],
     for i, (name, path) in enumerate(gauntlet_opponents_to_face):
         is_primary_target = (i == 0) # The first in this list is the highest-ranked opponent
         target_tag = " (Primary Target)" if is_primary_target else ""
-        print(f"  {i+1}. {name}{target_tag} (from {path})")
+        rating = ratings.get(path) if ratings is not None else None
+        rating_tag = f" [Rating {rating['rating']:.0f} +- {rating['rd']:.0f}]" if rating else ""
+        print(f"  {i+1}. {name}{target_tag}{rating_tag} (from {path})")
     
     return gauntlet_opponents_to_face
 
 
-# --- Competition Runner ---
-def run_match_series(challenger_logic_file: str, opponent_logic_file: str, 
-                     challenger_name_str: str, opponent_name_str: str,
-                     num_games: int, render_flag: bool) -> bool: # Returns True if challenger wins majority
-    
-    challenger_logic = load_logic_from_file(challenger_logic_file, "get_challenger_action")
-    opponent_logic = load_logic_from_file(opponent_logic_file, "get_challenger_action")
+# --- Out-of-Process AI Runners ---
+# Binary game-state frames sent to AI child processes. Positions travel as x-major cell indices
+# (x * grid_height + y) in an unsigned array, 16-bit unless the board has more than 65536 cells.
+_CONFIG_FRAME = struct.Struct('<cIIIII') # b'C', grid_width, grid_height, initial length, max length, max steps
+_SEED_FRAME = struct.Struct('<cQ')       # b'S', seed for the child's global random module
+_MOVE_HEADER = struct.Struct('<c?H')     # b'M', opponent present, number of foods
+_SNAKE_HEADER = struct.Struct('<BII?I')  # direction_idx, length, score, is_alive, number of positions
+_ACTION_REPLY = struct.Struct('<bB')     # action (-1 if not an int), status (0 ok, 1 exception)
+
+def _cell_typecode(config: GameConfig) -> str:
+    return 'H' if config.grid_width * config.grid_height <= 0x10000 else 'I'
+
+def encode_move_frame(my_snake: Snake, opponent_snake: Optional[Snake], foods: List[Food]) -> bytes:
+    height = my_snake.config.grid_height
+    parts = [_MOVE_HEADER.pack(b'M', opponent_snake is not None, len(foods))]
+    cells = array(_cell_typecode(my_snake.config))
+    for snake in (my_snake, opponent_snake):
+        if snake is None: continue
+        parts.append(_SNAKE_HEADER.pack(snake.direction_idx, snake.length, snake.score, snake.is_alive, len(snake.positions)))
+        cells.extend([x * height + y for x, y in snake.positions])
+    cells.extend([food.position[0] * height + food.position[1] for food in foods])
+    parts.append(cells.tobytes())
+    return b''.join(parts)
+
+def decode_move_frame(frame: bytes, config: GameConfig) -> Tuple[Snake, Optional[Snake], List[Food]]:
+    _, has_opponent, num_foods = _MOVE_HEADER.unpack_from(frame, 0)
+    offset = _MOVE_HEADER.size
+    headers = []
+    for _ in range(2 if has_opponent else 1):
+        headers.append(_SNAKE_HEADER.unpack_from(frame, offset))
+        offset += _SNAKE_HEADER.size
+    cells = array(_cell_typecode(config))
+    cells.frombytes(frame[offset:])
+    height, start = config.grid_height, 0
+    snakes = []
+    for direction_idx, length, score, is_alive, count in headers:
+        positions = [divmod(cell, height) for cell in cells[start:start + count]]
+        snakes.append(Snake.from_state(positions, direction_idx, length, score, is_alive, config=config))
+        start += count
+    foods = [Food(divmod(cell, height)) for cell in cells[start:start + num_foods]]
+    return snakes[0], (snakes[1] if has_opponent else None), foods
+
+class SharedPositions(Sequence):
+    # Read-only, head-first view of a snake body stored as cell indices in shared memory.
+    __slots__ = ('slots', 'start', 'count', 'height')
+
+    def __init__(self, slots: memoryview, start: int, count: int, height: int):
+        self.slots, self.start, self.count, self.height = slots, start, count, height
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0: index += self.count
+        if not 0 <= index < self.count: raise IndexError("snake position index out of range")
+        return divmod(self.slots[self.start + index], self.height)
+
+    def __iter__(self):
+        height = self.height
+        for cell in self.slots[self.start:self.start + self.count]:
+            yield divmod(cell, height)
+
+    def __contains__(self, pos) -> bool:
+        try:
+            x, y = pos
+        except (TypeError, ValueError):
+            return False
+        if not (0 <= y < self.height): return False
+        return x * self.height + y in self.slots[self.start:self.start + self.count]
+
+class SharedSnakeView:
+    """Read-only stand-in for a Snake whose state lives in a SharedGameState block.
+
+    It offers the attributes and query methods of SNAKE_CLASS_API_DOCS. Values are read from shared
+    memory on access, so a view is only meaningful during the move it was passed to.
+    """
+    DIRECTIONS_MAP = Snake.DIRECTIONS_MAP
+    ACTIONS_LIST = Snake.ACTIONS_LIST
+    OPPOSITE_ACTIONS_MAP = Snake.OPPOSITE_ACTIONS_MAP
+    get_head_position = Snake.get_head_position
+    get_current_direction_vector = Snake.get_current_direction_vector
+    get_valid_actions = Snake.get_valid_actions
+
+    def __init__(self, slots: memoryview, header: int, cells_start: int, config: GameConfig):
+        self._slots = slots
+        self._header = header
+        self.config = config
+        self.positions = SharedPositions(slots, cells_start, slots[header + 4], config.grid_height)
+
+    direction_idx = property(lambda self: self._slots[self._header])
+    length = property(lambda self: self._slots[self._header + 1])
+    score = property(lambda self: self._slots[self._header + 2])
+    is_alive = property(lambda self: bool(self._slots[self._header + 3]))
+
+class SharedGameState:
+    """One AI's view of the game in a shared memory block of int32 slots.
+
+    Layout: [has_opponent, num_foods, (direction_idx, length, score, is_alive, num_positions) for my
+    snake and the opponent, then the cell indices (x * grid_height + y) of my positions, the opponent's
+    positions and the foods]. The engine writes the state before each move and only a one-byte
+    doorbell goes over the pipe; the child reads it in place through SharedSnakeView proxies.
+    """
+    HEADER_SLOTS = 12
+
+    def __init__(self, config: GameConfig, name: Optional[str] = None):
+        self.config = config
+        num_cells = config.grid_width * config.grid_height
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None,
+                                              size=(self.HEADER_SLOTS + 3 * num_cells) * 4)
+        self._slots = self.shm.buf.cast('i')
+        self.slots = self._slots if name is None else self._slots.toreadonly() # Readers cannot write back
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, my_snake: Snake, opponent_snake: Optional[Snake], foods: List[Food]):
+        slots, height = self._slots, self.config.grid_height
+        cells = array('i')
+        slots[0] = opponent_snake is not None
+        slots[1] = len(foods)
+        for header, snake in ((2, my_snake), (7, opponent_snake)):
+            if snake is None: continue
+            slots[header:header + 5] = array('i', (snake.direction_idx, snake.length, snake.score,
+                                                   snake.is_alive, len(snake.positions)))
+            cells.extend([x * height + y for x, y in snake.positions])
+        cells.extend([food.position[0] * height + food.position[1] for food in foods])
+        slots[self.HEADER_SLOTS:self.HEADER_SLOTS + len(cells)] = cells
+
+    def read(self) -> Tuple[SharedSnakeView, Optional[SharedSnakeView], List[Food]]:
+        slots, height = self.slots, self.config.grid_height
+        my_snake = SharedSnakeView(slots, 2, self.HEADER_SLOTS, self.config)
+        food_start = self.HEADER_SLOTS + slots[6]
+        opponent_snake = None
+        if slots[0]:
+            opponent_snake = SharedSnakeView(slots, 7, food_start, self.config)
+            food_start += slots[11]
+        foods = [Food(divmod(cell, height)) for cell in slots[food_start:food_start + slots[1]]]
+        return my_snake, opponent_snake, foods
+
+    def close(self, unlink: bool = False):
+        if self.slots is not self._slots: self.slots.release()
+        self._slots.release()
+        self.shm.close()
+        if unlink: self.shm.unlink()
+
+def _ai_runner_main(conn, logic_file: str):
+    # Child process loop: load the AI once, then answer move frames until the pipe closes.
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl+C is handled by the engine, which closes the pipe
+    logic = load_logic_from_file(logic_file, "get_challenger_action")
+    conn.send_bytes(b'K' if logic else b'E')
+    if not logic: return
+    config = DEFAULT_GAME_CONFIG
+    shared_state: Optional[SharedGameState] = None
+    while True:
+        try:
+            frame = conn.recv_bytes()
+        except (EOFError, OSError):
+            if shared_state is not None: shared_state.close() # The engine unlinks the block
+            return
+        kind = frame[:1]
+        if kind == b'M':
+            if len(frame) == 1: # Doorbell: the state is waiting in shared memory
+                my_snake, opponent_snake, foods = shared_state.read()
+            else:
+                my_snake, opponent_snake, foods = decode_move_frame(frame, config)
+            try:
+                action = logic(my_snake, opponent_snake, foods, config.grid_width, config.grid_height)
+                reply = _ACTION_REPLY.pack(action if isinstance(action, int) and 0 <= action < 128 else -1, 0)
+            except Exception:
+                reply = _ACTION_REPLY.pack(-1, 1)
+            conn.send_bytes(reply)
+        elif kind == b'C':
+            config = GameConfig(*_CONFIG_FRAME.unpack(frame)[1:])
+        elif kind == b'A': # Attach to the engine's shared memory block for the current config
+            if shared_state is not None: shared_state.close()
+            shared_state = SharedGameState(config, frame[1:].decode())
+        elif kind == b'S':
+            random.seed(_SEED_FRAME.unpack(frame)[1])
+
+class RemoteAIError(Exception):
+    pass
+
+class SubprocessAIRunner:
+    """Runs one AI file in a long-lived child process and acts as its get_challenger_action.
+
+    With transport="shm" each move's state is written to a SharedGameState block and the child reads
+    it in place; with transport="pipe" it is sent as a binary frame. The child stays up across moves,
+    games and series. Crashes, exceptions and timeouts surface as exceptions to get_ai_action (which
+    falls back to a random valid move); a crashed or stuck child is killed and replaced on the next
+    move. This isolates the engine from untrusted code, but it is not a security sandbox.
+    """
+    def __init__(self, logic_file: str, transport: str = "shm"):
+        self.logic_file = logic_file
+        self.transport = transport
+        self.shared_state: Optional[SharedGameState] = None
+        self.owner_pid = os.getpid() # Forked pool workers inherit this object but not the child process
+        self.process = None
+        self.conn = None
+        self.config_sent: Optional[GameConfig] = None
+        self._start()
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn") # Fresh interpreter: nothing of the engine's state is inherited
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_ai_runner_main, args=(child_conn, self.logic_file), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.config_sent = None
+        try:
+            # A child stuck in the logic's module code (even inside a C call) must not hang the engine.
+            if not self.conn.poll(AI_RUNNER_START_TIMEOUT):
+                self.close()
+                raise RemoteAIError(f"AI runner process did not load {self.logic_file} within {AI_RUNNER_START_TIMEOUT:g} s.")
+            ready = self.conn.recv_bytes()
+        except EOFError:
+            ready = b'E'
+        if ready != b'K':
+            self.close()
+            raise RemoteAIError(f"Could not load {self.logic_file} in AI runner process.")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join()
+            self.process = None
+
+    def shutdown(self):
+        # close() only stops the child (it is restarted on demand); this also frees the shared memory.
+        self.close()
+        if self.shared_state is not None:
+            self.shared_state.close(unlink=True)
+            self.shared_state = None
+
+    def _ensure_started(self):
+        if self.process is None or not self.process.is_alive():
+            self.close()
+            self._start()
+
+    def start_game(self, seed: int):
+        self._ensure_started()
+        self.conn.send_bytes(_SEED_FRAME.pack(b'S', seed))
+
+    def request_action(self, my_snake: Snake, opponent_snake: Optional[Snake], foods: List[Food],
+                       move_deadline: Optional[float] = None) -> int:
+        try:
+            self._ensure_started()
+            config = my_snake.config
+            if config != self.config_sent:
+                self.conn.send_bytes(_CONFIG_FRAME.pack(b'C', config.grid_width, config.grid_height, config.initial_snake_length,
+                                              config.max_snake_length, config.max_steps_per_episode))
+                if self.transport == "shm":
+                    if self.shared_state is None or self.shared_state.config != config:
+                        if self.shared_state is not None: self.shared_state.close(unlink=True)
+                        self.shared_state = SharedGameState(config)
+                    self.conn.send_bytes(b'A' + self.shared_state.name.encode())
+                self.config_sent = config
+            if self.shared_state is not None:
+                self.shared_state.write(my_snake, opponent_snake, foods)
+                self.conn.send_bytes(b'M')
+            else:
+                self.conn.send_bytes(encode_move_frame(my_snake, opponent_snake, foods))
+            if move_deadline is not None and not self.conn.poll(move_deadline):
+                raise MoveTimeout()
+            action, status = _ACTION_REPLY.unpack(self.conn.recv_bytes())
+        except BaseException:
+            self.close() # Stuck, dead or out of sync: replaced on the next move
+            raise
+        if status:
+            raise RemoteAIError(f"AI in {self.logic_file} raised an exception.")
+        return action
+
+    def __call__(self, my_snake, opponent_snake, foods, grid_width, grid_height) -> int:
+        return self.request_action(my_snake, opponent_snake, foods)
+
+# Runners by (file content hash, transport): champions keep their child process across series and generations.
+_ai_runners: Dict[Tuple[str, str], SubprocessAIRunner] = {}
+
+def get_ai_runner(logic_file: str, transport: str = "shm") -> Optional[SubprocessAIRunner]:
+    digest = file_sha256(logic_file)
+    if digest is None:
+        print(f"Error: Logic file not readable: {logic_file}")
+        return None
+    key = (digest, transport)
+    runner = _ai_runners.pop(key, None) # Re-inserted below as most recently used
+    if runner is None or runner.owner_pid != os.getpid():
+        with open(logic_file, 'rb') as f:
+            problems = validate_logic_source(f.read(), logic_file)
+        if problems: # Fail here rather than in a freshly spawned child
+            print(f"Error: Rejected logic in {logic_file} before loading: {'; '.join(problems)}")
+            return None
+        try:
+            runner = SubprocessAIRunner(logic_file, transport)
+        except RemoteAIError as e:
+            print(f"Error loading logic from {logic_file}: {e}")
+            return None
+    _ai_runners[key] = runner
+    while len(_ai_runners) > AI_RUNNER_CACHE_SIZE:
+        _ai_runners.pop(next(iter(_ai_runners))).shutdown()
+    return runner
+
+def close_ai_runners():
+    # Stops every cached child process and frees its shared memory (registered with atexit).
+    while _ai_runners:
+        runner = _ai_runners.popitem()[1]
+        if runner.owner_pid == os.getpid(): runner.shutdown()
+
+atexit.register(close_ai_runners)
+
+def load_ai(logic_file: str, ai_runner: str = "inprocess") -> Optional[Callable]:
+    # The AI callable for a logic file: loaded into this process, or served by a child process
+    # ("subprocess" shares state through shared memory, "subprocess-pipe" sends it as frames).
+    if ai_runner == "subprocess":
+        return get_ai_runner(logic_file, "shm")
+    if ai_runner == "subprocess-pipe":
+        return get_ai_runner(logic_file, "pipe")
+    return load_logic_from_file(logic_file, "get_challenger_action")
 
-    if not challenger_logic:
-        print(f"CRITICAL Error: Failed to load challenger snake logic from {challenger_logic_file}. Challenger forfeits this match series.")
-        return False 
-    if not opponent_logic:
-        print(f"Warning: Failed to load opponent snake logic from {opponent_logic_file}. Using dummy random for opponent '{opponent_name_str}'.")
-        def dummy_logic(my_snake, opponent_snake, foods, grid_width, grid_height):
-            valid_actions = my_snake.get_valid_actions()
-            return random.choice(valid_actions) if valid_actions else my_snake.direction_idx
-        opponent_logic = dummy_logic
-        opponent_name_str = f"{opponent_name_str}_DummyFallback"
+# --- Competition Runner ---
+def dummy_random_logic(my_snake, opponent_snake, foods, grid_width, grid_height):
+    # Stand-in for opponents whose logic file fails to load.
+    valid_actions = my_snake.get_valid_actions()
+    return random.choice(valid_actions) if valid_actions else my_snake.direction_idx
+
+def greedy_food_logic(my_snake, opponent_snake, foods, grid_width, grid_height):
+    # Baseline: take the step that gets closest to the food on the wrapping board, ignoring all danger.
+    head_x, head_y = my_snake.get_head_position()
+    best_action, best_distance = my_snake.direction_idx, None
+    for action in my_snake.get_valid_actions():
+        dx, dy = my_snake.DIRECTIONS_MAP[action]
+        next_x, next_y = (head_x + dx) % grid_width, (head_y + dy) % grid_height
+        distance = 0
+        if foods:
+            food_x, food_y = foods[0].position
+            distance = min(abs(next_x - food_x), grid_width - abs(next_x - food_x)) \
+                       + min(abs(next_y - food_y), grid_height - abs(next_y - food_y))
+        if best_distance is None or distance < best_distance:
+            best_action, best_distance = action, distance
+    return best_action
+
+PRESCREEN_BASELINES = [("RandomBaseline", dummy_random_logic), ("GreedyFoodBaseline", greedy_food_logic)]
+
+class MoveStats:
+    """Latency histogram and fallback counts for one AI's get_challenger_action calls."""
+    BUCKETS_PER_OCTAVE = 8 # Histogram resolution: bucket bounds grow by 2**(1/8), about 9%
 
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.exceptions = 0
+        self.invalid_actions = 0
+        self.timeouts = 0
+        self.histogram: Dict[int, int] = {} # bucket -> calls; bucket b covers [2**(b/8), 2**((b+1)/8)) ns
+
+    def record(self, elapsed_ns: int, exception: bool = False, invalid: bool = False, timeout: bool = False):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns: self.max_ns = elapsed_ns
+        if exception: self.exceptions += 1
+        if invalid: self.invalid_actions += 1
+        if timeout: self.timeouts += 1
+        bucket = int(math.log2(elapsed_ns or 1) * self.BUCKETS_PER_OCTAVE)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def merge(self, other: "MoveStats"):
+        self.calls += other.calls
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.exceptions += other.exceptions
+        self.invalid_actions += other.invalid_actions
+        self.timeouts += other.timeouts
+        for bucket, count in other.histogram.items():
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+
+    def percentile_ns(self, fraction: float) -> int:
+        # Upper bound of the bucket holding the given fraction of calls, capped at the exact max.
+        if not self.calls: return 0
+        threshold, seen = fraction * self.calls, 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= threshold:
+                return min(int(2 ** ((bucket + 1) / self.BUCKETS_PER_OCTAVE)), self.max_ns)
+        return self.max_ns
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total_ns / 1e6, 3),
+            "mean_us": round(self.total_ns / self.calls / 1e3, 3) if self.calls else 0,
+            "p50_us": round(self.percentile_ns(0.50) / 1e3, 3),
+            "p99_us": round(self.percentile_ns(0.99) / 1e3, 3),
+            "max_us": round(self.max_ns / 1e3, 3),
+            "exceptions": self.exceptions,
+            "invalid_actions": self.invalid_actions,
+            "timeouts": self.timeouts,
+            "histogram_ns": {int(2 ** (bucket / self.BUCKETS_PER_OCTAVE)): count
+                             for bucket, count in sorted(self.histogram.items())},
+        }
+
+class MoveProfiler:
+    """Per-AI MoveStats for one generation, keyed by AI name."""
+    def __init__(self):
+        self.stats: Dict[str, MoveStats] = {}
 
-    env = SnakeEnvironment()
-    challenger_match_score = 0 # Tracks game outcomes: +1 for challenger win, -1 for opponent win, 0 for tie
+    def stats_for(self, ai_name: str) -> MoveStats:
+        if ai_name not in self.stats:
+            self.stats[ai_name] = MoveStats()
+        return self.stats[ai_name]
 
-    print(f"\n--- Starting Match Series: {challenger_name_str} (Challenger) vs. {opponent_name_str} (Opponent) ({num_games} games) ---")
+    def merge(self, other: "MoveProfiler"):
+        for ai_name, stats in other.stats.items():
+            self.stats_for(ai_name).merge(stats)
 
-    for game_num in range(1, num_games + 1):
+    def write_report(self, filepath: str, generation: int):
+        ranked = sorted(self.stats.items(), key=lambda item: -item[1].total_ns) # Most expensive AI first
+        report = {"generation": generation, "ais": {ai_name: stats.summary() for ai_name, stats in ranked}}
+        try:
+            os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+            with open(filepath, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Saved move latency profile to {filepath}")
+        except Exception as e:
+            print(f"Error saving move latency profile: {e}")
+
+class MoveTimeout(BaseException):
+    # BaseException, so an AI's own `except Exception:` blocks cannot swallow the deadline.
+    pass
+
+def _raise_move_timeout(signum, frame):
+    raise MoveTimeout()
+
+def call_with_deadline(func: Callable, deadline_s: float, *args):
+    # Interrupts func with MoveTimeout after deadline_s seconds using SIGALRM. Without it (Windows, or
+    # outside the main thread) func simply runs to completion and the caller discards late answers.
+    # Time spent inside a single C call (e.g. a huge sum()) cannot be interrupted either way.
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return func(*args)
+    if signal.getsignal(signal.SIGALRM) is not _raise_move_timeout:
+        signal.signal(signal.SIGALRM, _raise_move_timeout)
+    signal.setitimer(signal.ITIMER_REAL, deadline_s)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+def get_ai_action(logic: Callable, snake: Snake, other_snake: Snake, foods: List[Food],
+                  stats: Optional[MoveStats] = None, move_deadline: Optional[float] = None, rng=random) -> int:
+    # Asks an AI for its move, falling back to a random valid action on errors, invalid answers
+    # or (with move_deadline, in seconds) answers that take too long.
+    if not snake.is_alive: return snake.direction_idx
+    valid_actions = snake.get_valid_actions()
+    if not valid_actions: return snake.direction_idx
+    timed = stats is not None or move_deadline is not None
+    start_ns = time.perf_counter_ns() if timed else 0
+    try:
+        if move_deadline is None:
+            action = logic(snake, other_snake, foods, snake.config.grid_width, snake.config.grid_height)
+        elif isinstance(logic, SubprocessAIRunner): # Waits on the pipe with a timeout, so even C-level hangs are bounded
+            action = logic.request_action(snake, other_snake, foods, move_deadline)
+        else:
+            action = call_with_deadline(logic, move_deadline, snake, other_snake, foods,
+                                        snake.config.grid_width, snake.config.grid_height)
+        elapsed_ns = time.perf_counter_ns() - start_ns if timed else 0
+        if move_deadline is not None and elapsed_ns > move_deadline * 1e9:
+            raise MoveTimeout() # Finished, but too late to count
+        if action not in valid_actions:
+            if stats: stats.record(elapsed_ns, invalid=True)
+            return rng.choice(valid_actions)
+    except MoveTimeout:
+        if stats: stats.record(time.perf_counter_ns() - start_ns, timeout=True)
+        return rng.choice(valid_actions)
+    except Exception:
+        if stats: stats.record(time.perf_counter_ns() - start_ns, exception=True)
+        return rng.choice(valid_actions)
+    if stats: stats.record(elapsed_ns)
+    return action
+
+def score_game_result(snake1: Snake, snake2: Snake) -> int:
+    # +1 if snake1 (the challenger) won the finished game, -1 if snake2 won, 0 for a tie.
+    s1_alive, s2_alive = (snake1 and snake1.is_alive), (snake2 and snake2.is_alive)
+    if not s1_alive and not s2_alive: 
+        if snake1.score > snake2.score: return 1
+        if snake2.score > snake1.score: return -1
+        return 0
+    if not s1_alive: return -1 
+    if not s2_alive: return 1  
+    if snake1.score > snake2.score: return 1
+    if snake2.score > snake1.score: return -1
+    if snake1.length > snake2.length: return 1 
+    if snake2.length > snake1.length: return -1
+    return 0
+
+def game_rngs(seed: int) -> Tuple[random.Random, random.Random]:
+    # Independent streams for one seeded game: the environment (spawns, food) and the engine's fallback moves.
+    return random.Random(f"{seed}:env"), random.Random(f"{seed}:fallback")
+
+def series_seeds(challenger_logic_file: str, opponent_logic_file: str, num_games: int) -> List[int]:
+    # Game k of a series is played with seed series_seed + k, so any game can be replayed on its own.
+    # series_seed comes from SEED and both files' contents, so a repeated series replays (and, with a
+    # MatchResultCache, looks up) the same games. Unreadable files get a random series instead.
+    hashes = (file_sha256(challenger_logic_file), file_sha256(opponent_logic_file))
+    if None in hashes:
+        series_seed = random.randrange(2**32)
+    else:
+        series_seed = int(hashlib.sha256(f"{SEED}:{hashes[0]}:{hashes[1]}".encode()).hexdigest()[:15], 16)
+    return [series_seed + game_num for game_num in range(num_games)]
+
+def play_game(env: SnakeEnvironment, challenger_logic: Callable, opponent_logic: Callable,
+              render_flag: bool = False, challenger_name_str: str = "", opponent_name_str: str = "",
+              frame_delay: float = 0.05, profiler: Optional[MoveProfiler] = None,
+              move_deadline: Optional[float] = None,
+              seed: Optional[int] = None) -> int: # Returns the game result for the challenger (snake1)
+    # With a seed the game depends on nothing else: the environment and the fallback moves get their own
+    # streams, and the AIs' `random` module (in this process or in a runner's child) is reseeded with it.
+    # The global stream is restored afterwards, so the caller's later draws do not depend on the game.
+    fallback_rng, outer_random_state = random, None
+    if seed is not None:
+        env.rng, fallback_rng = game_rngs(seed)
+        outer_random_state = random.getstate()
+        random.seed(seed)
+    try:
         snake1, snake2, foods = env.reset() # snake1 is challenger, snake2 is opponent
         game_over = False
-        
+        for logic in (challenger_logic, opponent_logic):
+            if isinstance(logic, SubprocessAIRunner):
+                logic.start_game(seed if seed is not None else random.randrange(2**63))
+
         if render_flag:
             render_game(env, challenger_name_str, opponent_name_str)
             time.sleep(0.1) 
 
+        challenger_stats = profiler.stats_for(challenger_name_str) if profiler else None
+        opponent_stats = profiler.stats_for(opponent_name_str) if profiler else None
         while not game_over:
-            action1, action2 = snake1.direction_idx, snake2.direction_idx 
-
-            if snake1.is_alive:
-                valid_actions1 = snake1.get_valid_actions()
-                if valid_actions1:
-                    try:
-                        action1 = challenger_logic(snake1, snake2, foods, GRID_WIDTH, GRID_HEIGHT)
-                        if action1 not in valid_actions1: 
-                            action1 = random.choice(valid_actions1)
-                    except Exception:
-                        action1 = random.choice(valid_actions1)
-                else: 
-                    action1 = snake1.direction_idx 
-            
-            if snake2.is_alive:
-                valid_actions2 = snake2.get_valid_actions()
-                if valid_actions2:
-                    try:
-                        action2 = opponent_logic(snake2, snake1, foods, GRID_WIDTH, GRID_HEIGHT)
-                        if action2 not in valid_actions2: 
-                            action2 = random.choice(valid_actions2)
-                    except Exception:
-                        action2 = random.choice(valid_actions2)
-                else:
-                    action2 = snake2.direction_idx
+            action1 = get_ai_action(challenger_logic, snake1, snake2, foods, challenger_stats, move_deadline, fallback_rng)
+            action2 = get_ai_action(opponent_logic, snake2, snake1, foods, opponent_stats, move_deadline, fallback_rng)
 
             game_over, _, _ = env.step(action1, action2)
             foods = env.foods 
 
             if render_flag:
                 render_game(env, challenger_name_str, opponent_name_str)
-                time.sleep(0.05 if num_games <= 20 else 0.001) 
-            
-            if game_over: break
-        
-        game_result_for_challenger = 0
-        s1_alive, s2_alive = (snake1 and snake1.is_alive), (snake2 and snake2.is_alive)
-
-        if not s1_alive and not s2_alive: 
-            if snake1.score > snake2.score: game_result_for_challenger = 1
-            elif snake2.score > snake1.score: game_result_for_challenger = -1
-        elif not s1_alive: game_result_for_challenger = -1 
-        elif not s2_alive: game_result_for_challenger = 1  
-        else: 
-            if snake1.score > snake2.score: game_result_for_challenger = 1
-            elif snake2.score > snake1.score: game_result_for_challenger = -1
-            elif snake1.length > snake2.length: game_result_for_challenger = 1 
-            elif snake2.length > snake1.length: game_result_for_challenger = -1
-        
-        challenger_match_score += game_result_for_challenger
-        if render_flag and game_num < num_games : time.sleep(0.1) 
+                time.sleep(frame_delay) 
+    finally:
+        if outer_random_state is not None: random.setstate(outer_random_state)
+
+    return score_game_result(snake1, snake2)
+
+@dataclass(frozen=True)
+class MatchSettings:
+    # How each game of a series is played; handed as-is to pool workers.
+    config: GameConfig = DEFAULT_GAME_CONFIG
+    move_deadline: Optional[float] = None # Seconds per move, None for no limit
+    ai_runner: str = "inprocess" # "inprocess", "subprocess" or "subprocess-pipe" (see load_ai)
+
+def _init_pool_worker():
+    # Pool workers leave through multiprocessing's own exit path, which skips atexit, so their cached AI
+    # runners (child processes and shared memory) are closed by a multiprocessing finalizer instead.
+    multiprocessing.util.Finalize(None, close_ai_runners, exitpriority=10)
+
+def _new_process_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_pool_worker)
+
+def _play_seeded_games(challenger_logic_file: str, opponent_logic_file: str, seeds: List[int],
+                       settings: MatchSettings = MatchSettings(),
+                       profile_names: Optional[Tuple[str, str]] = None) -> Tuple[List[int], Optional[MoveProfiler], Tuple[bool, bool]]:
+    # The logic cache (or runner cache) means each worker process loads a given file only once.
+    # Also returns whether each file loaded, as an opponent that fails to load is played by dummy_random_logic.
+    challenger_logic = load_ai(challenger_logic_file, settings.ai_runner)
+    opponent_logic = load_ai(opponent_logic_file, settings.ai_runner)
+    loaded = (challenger_logic is not None, opponent_logic is not None)
+    if not challenger_logic: return [-1] * len(seeds), None, loaded # Challenger forfeits games it cannot load for
+    opponent_logic = opponent_logic or dummy_random_logic
+    env = SnakeEnvironment(settings.config)
+    profiler = MoveProfiler() if profile_names else None
+    challenger_name_str, opponent_name_str = profile_names or ("", "")
+    results = []
+    for seed in seeds: # Each game depends only on its own seed, whichever worker plays it
+        results.append(play_game(env, challenger_logic, opponent_logic, challenger_name_str=challenger_name_str,
+                                 opponent_name_str=opponent_name_str, profiler=profiler,
+                                 move_deadline=settings.move_deadline, seed=seed))
+    return results, profiler, loaded
 
-    print(f"\n--- Match Series Summary ({challenger_name_str} vs. {opponent_name_str}) ---")
-    print(f"Challenger ({challenger_name_str}) Total Score: {challenger_match_score} over {num_games} games.")
+@dataclass
+class SeriesTally:
+    num_games: int
+    wins: int = 0
+    losses: int = 0
+    ties: int = 0
+    decision: Optional[bool] = None # Set once the early-stop rule settles the series
+    opponent_load_failed: bool = False # The games were against dummy_random_logic, not the opponent's own logic
+
+    @property
+    def played(self) -> int:
+        return self.wins + self.losses + self.ties
+
+    @property
+    def score(self) -> int: # Same as the classic challenger_match_score
+        return self.wins - self.losses
+
+    @property
+    def won(self) -> bool:
+        return self.decision if self.decision is not None else self.score > 0
+
+    def add(self, results: List[int]):
+        for result in results:
+            if result > 0: self.wins += 1
+            elif result < 0: self.losses += 1
+            else: self.ties += 1
+
+@dataclass
+class EarlyStopRule:
+    mode: str = "off" # "off": play every game; "decided": stop once the rest cannot flip the result; "sprt": also stop on the SPRT bounds
+    p0: float = SPRT_P0
+    p1: float = SPRT_P1
+    alpha: float = SPRT_ALPHA
+    beta: float = SPRT_BETA
+
+    def decide(self, tally: SeriesTally) -> Optional[bool]:
+        # Returns True (series won), False (series lost) or None (keep playing).
+        if self.mode == "off": return None
+        remaining = tally.num_games - tally.played
+        if tally.score - remaining > 0: return True
+        if tally.score + remaining <= 0: return False # A tied series is not a win
+        if self.mode == "sprt":
+            log_likelihood_ratio = tally.wins * math.log(self.p1 / self.p0) \
+                                   + tally.losses * math.log((1 - self.p1) / (1 - self.p0))
+            if log_likelihood_ratio >= math.log((1 - self.beta) / self.alpha): return True
+            if log_likelihood_ratio <= math.log(self.beta / (1 - self.alpha)): return False
+        return None
+
+class MatchResultCache:
+    """SQLite store of finished game results, keyed by both logic files' contents, the seed and the settings.
+
+    A game's result depends only on those (see play_game), and series_seeds gives a repeated series the
+    same seeds, so it reuses every game it has played before: re-running a gauntlet against an unchanged
+    challenger costs a few lookups. Series with a move deadline are not cached, as timeouts depend on timing.
+    """
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory: os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS game_results (
+            challenger_hash TEXT NOT NULL, opponent_hash TEXT NOT NULL, settings TEXT NOT NULL,
+            seed INTEGER NOT NULL, result INTEGER NOT NULL,
+            PRIMARY KEY (challenger_hash, opponent_hash, settings, seed)) WITHOUT ROWID""")
+        self.conn.commit()
+
+    @staticmethod
+    def series_key(challenger_logic_file: str, opponent_logic_file: str,
+                   settings: MatchSettings) -> Optional[Tuple[str, str, str]]:
+        if settings.move_deadline is not None: return None # Results depend on how fast the machine happened to be
+        challenger_hash, opponent_hash = file_sha256(challenger_logic_file), file_sha256(opponent_logic_file)
+        if challenger_hash is None or opponent_hash is None: return None
+        settings_dict = asdict(settings)
+        # Both subprocess transports play identical games; in-process AIs share one random stream, so they differ.
+        settings_dict["ai_runner"] = "subprocess" if settings.ai_runner.startswith("subprocess") else settings.ai_runner
+        settings_dict["version"] = MATCH_CACHE_VERSION
+        return challenger_hash, opponent_hash, json.dumps(settings_dict, sort_keys=True)
+
+    def lookup(self, key: Optional[Tuple[str, str, str]], seeds: List[int]) -> Dict[int, int]:
+        # Cached results for whichever of seeds have been played before.
+        if key is None or not seeds: return {}
+        found = {}
+        for i in range(0, len(seeds), 500): # Stay below SQLite's bound-parameter limit
+            chunk = seeds[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT seed, result FROM game_results WHERE challenger_hash = ? AND opponent_hash = ? "
+                f"AND settings = ? AND seed IN ({','.join('?' * len(chunk))})", (*key, *chunk))
+            found.update(rows)
+        return found
+
+    def store(self, key: Optional[Tuple[str, str, str]], results: Dict[int, int]):
+        if key is None or not results: return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO game_results VALUES (?, ?, ?, ?, ?)",
+                                  [(*key, seed, result) for seed, result in results.items()])
+
+    def close(self):
+        self.conn.close()
+
+def open_match_cache(path: Optional[str]) -> Optional[MatchResultCache]:
+    if not path: return None
+    try:
+        return MatchResultCache(path)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: Could not open match result cache {path}: {e}. Playing every game.")
+        return None
+
+def _run_series_in_pool(challenger_logic_file: str, challenger_name_str: str, opponents: List[Tuple[str, str]],
+                        num_games: int, workers: int, stop_rule: EarlyStopRule, abort_on_loss: bool,
+                        settings: MatchSettings = MatchSettings(),
+                        profiler: Optional[MoveProfiler] = None,
+                        cache: Optional[MatchResultCache] = None) -> List[SeriesTally]:
+    # Plays one series per (name, logic file) opponent on a shared process pool, in small interleaved chunks of seeded games.
+    # A series settled by stop_rule has its remaining chunks cancelled; with abort_on_loss, a lost series
+    # cancels everything still pending. Games found in cache are counted up front instead of being played.
+    games_per_task = max(1, min(4, num_games // workers))
+    tallies = [SeriesTally(num_games) for _ in opponents]
+    cache_keys = []
+    series_tasks = []
+    for (opponent_name_str, opponent_logic_file), tally in zip(opponents, tallies):
+        seeds = series_seeds(challenger_logic_file, opponent_logic_file, num_games)
+        cache_key = cache.series_key(challenger_logic_file, opponent_logic_file, settings) if cache else None
+        cached = cache.lookup(cache_key, seeds) if cache else {}
+        if cached:
+            print(f"Reusing {len(cached)} cached game results against {opponent_name_str}.")
+            tally.add([cached[seed] for seed in seeds if seed in cached])
+            tally.decision = stop_rule.decide(tally)
+        seeds = [seed for seed in seeds if seed not in cached] if tally.decision is None else []
+        cache_keys.append(cache_key)
+        series_tasks.append([seeds[i:i + games_per_task] for i in range(0, len(seeds), games_per_task)])
+    if abort_on_loss and any(tally.decision is False for tally in tallies):
+        return tallies
+
+    pool = _new_process_pool(workers)
+    try:
+        futures: Dict[Future, int] = {}
+        task_seeds: Dict[Future, List[int]] = {}
+        # Interleave the series so they all progress together and a lost one shows up early.
+        for task_idx in range(max(len(tasks) for tasks in series_tasks)):
+            for series_idx, (opponent_name_str, opponent_logic_file) in enumerate(opponents):
+                if task_idx < len(series_tasks[series_idx]):
+                    profile_names = (challenger_name_str, opponent_name_str) if profiler else None
+                    future = pool.submit(_play_seeded_games, challenger_logic_file, opponent_logic_file,
+                                         series_tasks[series_idx][task_idx], settings, profile_names)
+                    futures[future] = series_idx
+                    task_seeds[future] = series_tasks[series_idx][task_idx]
+        for future in as_completed(futures):
+            if future.cancelled(): continue # as_completed also yields the chunks cancelled below
+            tally = tallies[futures[future]]
+            results, task_profiler, (_, opponent_loaded) = future.result()
+            if profiler and task_profiler: profiler.merge(task_profiler)
+            if not opponent_loaded: tally.opponent_load_failed = True
+            elif cache: cache.store(cache_keys[futures[future]], dict(zip(task_seeds[future], results)))
+            if tally.decision is not None: continue # Late chunk of an already settled series
+            tally.add(results)
+            tally.decision = stop_rule.decide(tally)
+            if tally.decision is None: continue
+            if abort_on_loss and not tally.decision: break
+            for other_future, series_idx in futures.items():
+                if tallies[series_idx] is tally: other_future.cancel()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True) # Running chunks are short; waiting reaps the workers
+    return tallies
+
+def _print_move_timeouts(profiler: MoveProfiler, move_deadline: Optional[float]):
+    if move_deadline is None: return
+    for ai_name, stats in profiler.stats.items():
+        if stats.timeouts:
+            print(f"Warning: '{ai_name}' exceeded the {move_deadline * 1000:g} ms move deadline {stats.timeouts} times (random fallback moves used).")
+
+def run_match_series(challenger_logic_file: str, opponent_logic_file: str, 
+                     challenger_name_str: str, opponent_name_str: str,
+                     num_games: int, render_flag: bool,
+                     workers: int = 1, stop_rule: Optional[EarlyStopRule] = None,
+                     config: GameConfig = DEFAULT_GAME_CONFIG,
+                     profiler: Optional[MoveProfiler] = None,
+                     move_deadline: Optional[float] = None,
+                     ai_runner: str = "inprocess",
+                     cache: Optional[MatchResultCache] = None,
+                     ratings: Optional[RatingTable] = None) -> bool: # Returns True if challenger wins majority
+    
+    challenger_logic = load_ai(challenger_logic_file, ai_runner)
+    opponent_logic = load_ai(opponent_logic_file, ai_runner)
 
-    challenger_won_series = challenger_match_score > 0
+    if not challenger_logic:
+        print(f"CRITICAL Error: Failed to load challenger snake logic from {challenger_logic_file}. Challenger forfeits this match series.")
+        return False 
+    if not opponent_logic:
+        print(f"Warning: Failed to load opponent snake logic from {opponent_logic_file}. Using dummy random for opponent '{opponent_name_str}'.")
+        opponent_logic = dummy_random_logic
+        opponent_name_str = f"{opponent_name_str}_DummyFallback"
+        ratings = cache = None # The games are not against the opponent's own logic
+
+    if workers > 1 and render_flag:
+        print("Rendering requires sequential games. Ignoring --workers for this match series.")
+        workers = 1
+    if render_flag: cache = None # Games are being watched, so play them
+    stop_rule = stop_rule or EarlyStopRule()
+    # Per-series stats, so move-deadline timeouts can be reported even when no profile was requested.
+    series_profiler = MoveProfiler() if profiler or move_deadline is not None else None
+
+    print(f"\n--- Starting Match Series: {challenger_name_str} (Challenger) vs. {opponent_name_str} (Opponent) ({num_games} games) ---")
+
+    settings = MatchSettings(config, move_deadline, ai_runner)
+    if workers > 1:
+        tally, = _run_series_in_pool(challenger_logic_file, challenger_name_str, [(opponent_name_str, opponent_logic_file)],
+                                     num_games, workers, stop_rule, abort_on_loss=False,
+                                     settings=settings, profiler=series_profiler, cache=cache)
+    else:
+        tally = SeriesTally(num_games)
+        env = SnakeEnvironment(config)
+        # Same seeds as the pool path, so the worker count never changes a series' results.
+        seeds = series_seeds(challenger_logic_file, opponent_logic_file, num_games)
+        cache_key = cache.series_key(challenger_logic_file, opponent_logic_file, settings) if cache else None
+        cached = cache.lookup(cache_key, seeds) if cache else {}
+        if cached: print(f"Reusing {len(cached)} cached game results.")
+        new_results: Dict[int, int] = {}
+        for game_num, seed in enumerate(seeds, start=1):
+            if seed in cached:
+                tally.add([cached[seed]])
+            else:
+                new_results[seed] = play_game(env, challenger_logic, opponent_logic, render_flag,
+                                              challenger_name_str, opponent_name_str,
+                                              frame_delay=0.05 if num_games <= 20 else 0.001, profiler=series_profiler,
+                                              move_deadline=move_deadline, seed=seed)
+                tally.add([new_results[seed]])
+            tally.decision = stop_rule.decide(tally)
+            if tally.decision is not None: break
+            if render_flag and game_num < num_games : time.sleep(0.1) 
+        if cache: cache.store(cache_key, new_results)
+
+    challenger_match_score = tally.score # Tracks game outcomes: +1 for challenger win, -1 for opponent win, 0 for tie
+    if ratings:
+        ratings.record_series(challenger_logic_file, challenger_name_str, opponent_logic_file, opponent_name_str,
+                              tally.wins, tally.losses, tally.ties)
+
+    print(f"\n--- Match Series Summary ({challenger_name_str} vs. {opponent_name_str}) ---")
+    print(f"Challenger ({challenger_name_str}) Total Score: {challenger_match_score} over {tally.played} games.")
+    if tally.played < num_games:
+        print(f"Series decided early by '{stop_rule.mode}' early stopping ({num_games - tally.played} of {num_games} games skipped).")
+    if series_profiler:
+        _print_move_timeouts(series_profiler, move_deadline)
+        if profiler: profiler.merge(series_profiler)
+
+    challenger_won_series = tally.won
     if challenger_won_series:
         print(f"Challenger ({challenger_name_str}) WON the series against {opponent_name_str}.")
-    elif challenger_match_score == 0:
+    elif challenger_match_score == 0 and tally.played == num_games:
         print(f"TIED SERIES between {challenger_name_str} and {opponent_name_str}.")
     else:
         print(f"Challenger ({challenger_name_str}) LOST the series against {opponent_name_str}.")
     print("--------------------------------------")
     return challenger_won_series
 
+def run_gauntlet_parallel(challenger_logic_file: str, challenger_name_str: str,
+                          gauntlet_opponents: List[Tuple[str, str]],
+                          num_games: int, workers: int,
+                          stop_rule: Optional[EarlyStopRule] = None,
+                          config: GameConfig = DEFAULT_GAME_CONFIG,
+                          profiler: Optional[MoveProfiler] = None,
+                          move_deadline: Optional[float] = None,
+                          ai_runner: str = "inprocess",
+                          cache: Optional[MatchResultCache] = None,
+                          ratings: Optional[RatingTable] = None) -> bool: # Returns True if challenger wins every series
+    # Plays all gauntlet series at once on one process pool. A series is lost as soon as the games still
+    # outstanding cannot lift the challenger's score above zero, which cancels the rest of the gauntlet.
+    if not load_ai(challenger_logic_file, ai_runner):
+        print(f"CRITICAL Error: Failed to load challenger snake logic from {challenger_logic_file}. Challenger forfeits the gauntlet.")
+        return False
+    if stop_rule is None or stop_rule.mode == "off":
+        stop_rule = EarlyStopRule("decided")
+
+    print(f"\n--- Starting Parallel Gauntlet: {challenger_name_str} vs. {len(gauntlet_opponents)} opponents ({num_games} games each, {workers} workers) ---")
+    gauntlet_profiler = MoveProfiler() if profiler or move_deadline is not None else None
+    tallies = _run_series_in_pool(challenger_logic_file, challenger_name_str, gauntlet_opponents,
+                                  num_games, workers, stop_rule, abort_on_loss=True,
+                                  settings=MatchSettings(config, move_deadline, ai_runner), profiler=gauntlet_profiler,
+                                  cache=cache)
+    gauntlet_lost = any(tally.decision is False for tally in tallies)
+    for (opponent_name, opponent_logic_file), tally in zip(gauntlet_opponents, tallies):
+        if tally.opponent_load_failed:
+            print(f"Warning: Failed to load opponent snake logic from {opponent_logic_file}. '{opponent_name}' was played by dummy random and its rating is left unchanged.")
+        elif ratings:
+            ratings.record_series(challenger_logic_file, challenger_name_str, opponent_logic_file, opponent_name,
+                                  tally.wins, tally.losses, tally.ties)
+
+    print(f"\n--- Parallel Gauntlet Summary ({challenger_name_str}) ---")
+    for (opponent_name, _), tally in zip(gauntlet_opponents, tallies):
+        if tally.decision is None:
+            outcome = "CANCELLED" if gauntlet_lost else ("WON" if tally.won else "LOST")
+        else:
+            outcome = "WON" if tally.decision else "LOST"
+            if tally.played < num_games: outcome += " (decided early)"
+        print(f"  vs. {opponent_name}: {outcome}, score {tally.score} over {tally.played}/{num_games} games.")
+    if gauntlet_profiler:
+        _print_move_timeouts(gauntlet_profiler, move_deadline)
+        if profiler: profiler.merge(gauntlet_profiler)
+    print("--------------------------------------")
+    return not gauntlet_lost and all(tally.won for tally in tallies)
+
+# --- Multi-candidate Selection ---
+def normalized_ast_hash(source: str) -> Optional[str]:
+    # Hash of the code's syntax tree without docstrings, so candidates differing only in comments,
+    # formatting or docstrings count as duplicates. None if the source does not parse.
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    for node in ast.walk(tree):
+        body = getattr(node, 'body', None)
+        if isinstance(body, list) and body and isinstance(body[0], ast.Expr) \
+                and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+            node.body = body[1:] or [ast.Pass()]
+    return hashlib.sha256(ast.dump(tree, annotate_fields=False).encode()).hexdigest()
+
+def play_round_robin_pairs(logic_files: List[str], games_per_pair: int, settings: MatchSettings = MatchSettings(),
+                           workers: int = 1, cache: Optional[MatchResultCache] = None
+                           ) -> Tuple[Dict[Tuple[int, int], List[int]], Set[int]]:
+    # Plays games_per_pair seeded games for every pair i < j of logic_files, spread over a process pool.
+    # Returns the game results from file i's side, per pair, and the indices of files that failed to load.
+    # A file that fails to load forfeits all its games. Games found in the cache are not replayed.
+    pairs = [(i, j) for i in range(len(logic_files)) for j in range(i + 1, len(logic_files))]
+    pair_seeds = {(i, j): series_seeds(logic_files[i], logic_files[j], games_per_pair) for i, j in pairs}
+    cache_keys = {pair: cache.series_key(logic_files[pair[0]], logic_files[pair[1]], settings) for pair in pairs} if cache else {}
+    results = {pair: cache.lookup(cache_keys[pair], pair_seeds[pair]) if cache else {} for pair in pairs}
+    pending = {pair: [seed for seed in pair_seeds[pair] if seed not in results[pair]] for pair in pairs}
+    pending = {pair: seeds for pair, seeds in pending.items() if seeds}
+    if cache and len(pending) < len(pairs): print(f"Reusing cached games for {len(pairs) - len(pending)} of {len(pairs)} pairs.")
+
+    unloadable: Set[int] = set()
+
+    def record(pair: Tuple[int, int], games: List[int], loaded: Tuple[bool, bool]):
+        if not all(loaded):
+            unloadable.update(idx for idx, ok in zip(pair, loaded) if not ok)
+            results[pair].update({seed: 1 if loaded[0] else -1 for seed in pending[pair]})
+            return
+        new_results = dict(zip(pending[pair], games))
+        results[pair].update(new_results)
+        if cache: cache.store(cache_keys[pair], new_results)
+
+    if workers > 1 and len(pending) > 1:
+        with _new_process_pool(workers) as pool:
+            futures = {pool.submit(_play_seeded_games, logic_files[i], logic_files[j], seeds, settings): (i, j)
+                       for (i, j), seeds in pending.items()}
+            report_every = max(1, len(futures) // 10)
+            for done, future in enumerate(as_completed(futures), start=1):
+                games, _, loaded = future.result()
+                record(futures[future], games, loaded)
+                if done % report_every == 0 and len(futures) >= 20: print(f"  {done}/{len(futures)} pairs played.")
+    else:
+        for (i, j), seeds in pending.items():
+            games, _, loaded = _play_seeded_games(logic_files[i], logic_files[j], seeds, settings)
+            record((i, j), games, loaded)
+    return {pair: [results[pair][seed] for seed in pair_seeds[pair]] for pair in pairs}, unloadable
+
+def run_candidate_tournament(candidate_files: List[str], games_per_pair: int, settings: MatchSettings = MatchSettings(),
+                             workers: int = 1) -> List[int]:
+    # Round robin between candidate logic files. Returns each candidate's total score (wins - losses).
+    scores = [0] * len(candidate_files)
+    for (i, j), results in play_round_robin_pairs(candidate_files, games_per_pair, settings, workers)[0].items():
+        scores[i] += sum(results)
+        scores[j] -= sum(results)
+    return scores
+
+def select_challenger_candidate(candidates: List[Tuple[str, str]], games_per_pair: int,
+                                settings: MatchSettings = MatchSettings(), workers: int = 1) -> Optional[Tuple[str, str]]:
+    # Drops candidates that fail validation or duplicate an earlier one, then lets the rest play a round
+    # robin. Returns the (name, code) with the best score; ties go to the earlier candidate.
+    unique: List[Tuple[str, str]] = []
+    seen_hashes = set()
+    for name, code in candidates:
+        problems = validate_logic_source(code, name)
+        if problems:
+            print(f"Candidate '{name}' rejected: {'; '.join(problems)}")
+            continue
+        code_hash = normalized_ast_hash(code)
+        if code_hash in seen_hashes:
+            print(f"Candidate '{name}' is a duplicate of an earlier candidate. Skipping it.")
+            continue
+        seen_hashes.add(code_hash)
+        unique.append((name, code))
+    if len(unique) <= 1:
+        return unique[0] if unique else None
+
+    print(f"\n--- Candidate Tournament: {len(unique)} candidates, {games_per_pair} games per pair ---")
+    candidate_dir = tempfile.mkdtemp(prefix="snake_candidates_")
+    try:
+        candidate_files = []
+        for idx, (_, code) in enumerate(unique):
+            candidate_files.append(os.path.join(candidate_dir, f"candidate_{idx}.py"))
+            with open(candidate_files[-1], 'w') as f: f.write(code)
+        scores = run_candidate_tournament(candidate_files, games_per_pair, settings, workers)
+    finally:
+        shutil.rmtree(candidate_dir, ignore_errors=True)
+    for (name, _), score in sorted(zip(unique, scores), key=lambda item: -item[1]):
+        print(f"  {name}: {score:+d}")
+    best_idx = max(range(len(unique)), key=lambda idx: (scores[idx], -idx))
+    print(f"Candidate '{unique[best_idx][0]}' goes on to the gauntlet.")
+    return unique[best_idx]
+
+# --- Round-robin Tournament ---
+ROUND_ROBIN_OUTPUT = "round_robin.json"
+
+def archived_logic_files(directory: str = PAST_CHAMPIONS_DIR) -> List[str]:
+    # Snake logic files in the archive, in name order. Other scripts kept there fail validation and are left out.
+    files = []
+    for filename in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        filepath = os.path.join(directory, filename)
+        if not filename.endswith('.py'): continue
+        with open(filepath) as f:
+            if not validate_logic_source(f.read(), filepath):
+                files.append(filepath)
+    return files
+
+def run_round_robin(logic_files: List[str], games_per_pair: int, settings: MatchSettings = MatchSettings(),
+                    workers: int = 1, cache: Optional[MatchResultCache] = None,
+                    output_path: str = ROUND_ROBIN_OUTPUT, ratings: Optional[RatingTable] = None) -> Dict[str, Any]:
+    """Plays every pair of logic_files against each other and writes the win matrix to output_path as JSON.
+
+    Byte-identical files play once, under the first one's name; the others are listed in "duplicates".
+    wins[i][j] counts the games players[i] won against players[j] and ties[i][j] the tied ones; players
+    are ranked by score (wins - losses over all their games). Every pair's games also update ratings.
+    Files that fail to load are listed in "unloadable" and take no part in the matrix, standings or ratings.
+    """
+    players: List[str] = []
+    player_files: List[str] = []
+    duplicates: Dict[str, str] = {}
+    name_by_hash: Dict[str, str] = {}
+    for logic_file in logic_files:
+        name, digest = os.path.basename(logic_file).replace('.py', ''), file_sha256(logic_file)
+        if digest is None:
+            print(f"Warning: Could not read {logic_file}. Leaving it out of the round robin.")
+        elif digest in name_by_hash:
+            duplicates[name] = name_by_hash[digest]
+        else:
+            name_by_hash[digest] = name
+            players.append(name)
+            player_files.append(logic_file)
+
+    num_pairs = len(players) * (len(players) - 1) // 2
+    print(f"\n--- Round Robin: {len(players)} AIs ({len(duplicates)} duplicates skipped), {num_pairs} pairs, "
+          f"{games_per_pair} games per pair, {workers} workers ---")
+    wins = [[0] * len(players) for _ in players]
+    ties = [[0] * len(players) for _ in players]
+    pair_results, unloadable = play_round_robin_pairs(player_files, games_per_pair, settings, workers, cache)
+    for idx in sorted(unloadable):
+        print(f"Warning: Failed to load snake logic from {player_files[idx]}. Leaving '{players[idx]}' out of the standings and ratings.")
+    for (i, j), results in pair_results.items():
+        if i in unloadable or j in unloadable: continue
+        wins[i][j], wins[j][i] = results.count(1), results.count(-1)
+        ties[i][j] = ties[j][i] = results.count(0)
+        if ratings: ratings.record_series(player_files[i], players[i], player_files[j], players[j], wins[i][j], wins[j][i], ties[i][j])
+    scores = {name: sum(wins[idx]) - sum(row[idx] for row in wins) for idx, name in enumerate(players) if idx not in unloadable}
+
+    print("\n--- Round Robin Standings ---")
+    for rank, (name, score) in enumerate(sorted(scores.items(), key=lambda item: -item[1]), start=1):
+        idx = players.index(name)
+        print(f"{rank}. {name}: score {score:+d} ({sum(wins[idx])} W / {sum(row[idx] for row in wins)} L / {sum(ties[idx])} T)")
+    for name, kept_name in duplicates.items():
+        print(f"   {name}: identical to {kept_name}")
+
+    report = {"games_per_pair": games_per_pair,
+              "settings": {"grid_width": settings.config.grid_width, "grid_height": settings.config.grid_height,
+                           "initial_snake_length": settings.config.initial_snake_length,
+                           "move_deadline": settings.move_deadline},
+              "players": players, "wins": wins, "ties": ties,
+              "scores": dict(sorted(scores.items(), key=lambda item: -item[1])), "duplicates": duplicates,
+              "unloadable": [players[idx] for idx in sorted(unloadable)]}
+    try:
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, output_path)
+        print(f"Saved round robin win matrix to {output_path}")
+    except OSError as e:
+        print(f"Error saving round robin results: {e}")
+    return report
+
+# --- Challenger Pre-screen ---
+def _play_baseline_games(challenger_logic: Callable, baseline_logic: Callable, num_games: int, seed: int,
+                         config: GameConfig, stats: MoveStats, move_deadline: float) -> List[int]:
+    # Game results for the challenger against one baseline. With NumPy all games advance together on a
+    # BatchSnakeEnvironment and only the AIs' own calls run per game; without it they are played one by one.
+    if np is None or config.initial_snake_length > min(config.grid_width, config.grid_height):
+        profiler = MoveProfiler()
+        profiler.stats["challenger"] = stats
+        env = SnakeEnvironment(config)
+        return [play_game(env, challenger_logic, baseline_logic, challenger_name_str="challenger",
+                          opponent_name_str="baseline", profiler=profiler, move_deadline=move_deadline,
+                          seed=seed + game_num) for game_num in range(num_games)]
+    env = BatchSnakeEnvironment(num_games, seed, config)
+    env.reset()
+    fallback_rng = random.Random(f"{seed}:fallback")
+    outer_random_state = random.getstate()
+    random.seed(seed) # For AIs that use the random module, as in play_game
+    try:
+        while not env.game_over.all():
+            actions1, actions2 = env.directions[:, 0].copy(), env.directions[:, 1].copy()
+            for game in np.flatnonzero(~env.game_over):
+                snake1, snake2, foods = env.get_snake(game, 0), env.get_snake(game, 1), env.get_foods(game)
+                actions1[game] = get_ai_action(challenger_logic, snake1, snake2, foods, stats, move_deadline, fallback_rng)
+                actions2[game] = get_ai_action(baseline_logic, snake2, snake1, foods, rng=fallback_rng)
+            env.step(actions1, actions2)
+    finally:
+        random.setstate(outer_random_state)
+    return env.game_results().tolist()
+
+# Losses per baseline of champions already measured, by (file hash, games, config, move deadline).
+_champion_baseline_losses: Dict[Tuple[str, int, GameConfig, float], List[int]] = {}
+
+def champion_baseline_losses(champion_logic_file: str, num_games: int, config: GameConfig, move_deadline: float,
+                             ai_runner: str = "inprocess") -> Optional[List[int]]:
+    # How many of the pre-screen games against each baseline the champion itself loses (None if it cannot be loaded).
+    # Measured once per champion, on the same seeds the challengers play.
+    key = (file_sha256(champion_logic_file), num_games, config, move_deadline)
+    if key[0] is None: return None
+    if key not in _champion_baseline_losses:
+        champion_logic = load_ai(champion_logic_file, ai_runner)
+        if not champion_logic: return None
+        _champion_baseline_losses[key] = [
+            sum(r < 0 for r in _play_baseline_games(champion_logic, baseline_logic, num_games, SEED + baseline_idx * num_games,
+                                                     config, MoveStats(), move_deadline))
+            for baseline_idx, (_, baseline_logic) in enumerate(PRESCREEN_BASELINES)]
+    return _champion_baseline_losses[key]
+
+def prescreen_challenger(challenger_logic_file: str, challenger_name_str: str, num_games: int,
+                         config: GameConfig = DEFAULT_GAME_CONFIG, move_deadline: Optional[float] = None,
+                         ai_runner: str = "inprocess",
+                         champion_logic_file: Optional[str] = None) -> bool: # Returns True if the challenger may enter the gauntlet
+    # A few quick games against built-in baselines. Challengers that crash, time out or lose badly are
+    # rejected here instead of costing full gauntlet series. "Badly" is measured against champion_logic_file's
+    # own record on the same games when it is given (see PRESCREEN_LOSS_MARGIN).
+    print(f"\n--- Pre-screen: {challenger_name_str} vs. {', '.join(name for name, _ in PRESCREEN_BASELINES)} ({num_games} games each) ---")
+    challenger_logic = load_ai(challenger_logic_file, ai_runner)
+    if not challenger_logic:
+        print(f"Pre-screen REJECTED '{challenger_name_str}': its logic could not be loaded.")
+        return False
+    move_deadline = move_deadline or PRESCREEN_MOVE_DEADLINE
+    champion_losses = champion_baseline_losses(champion_logic_file, num_games, config, move_deadline, ai_runner) \
+                      if champion_logic_file else None
+    stats = MoveStats()
+    for baseline_idx, (baseline_name, baseline_logic) in enumerate(PRESCREEN_BASELINES):
+        results = _play_baseline_games(challenger_logic, baseline_logic, num_games, SEED + baseline_idx * num_games,
+                                       config, stats, move_deadline)
+        wins, losses = sum(r > 0 for r in results), sum(r < 0 for r in results)
+        print(f"  vs. {baseline_name}: {wins} wins, {losses} losses, {len(results) - wins - losses} ties.")
+        max_losses = PRESCREEN_MAX_LOSS_RATE * num_games
+        if champion_losses is not None:
+            max_losses = max(max_losses, champion_losses[baseline_idx] + PRESCREEN_LOSS_MARGIN * num_games)
+        if losses > max_losses:
+            champion_note = f" (the champion lost {champion_losses[baseline_idx]})" if champion_losses is not None else ""
+            print(f"Pre-screen REJECTED '{challenger_name_str}': lost {losses}/{num_games} games to {baseline_name}{champion_note}.")
+            return False
+        faults = stats.exceptions + stats.timeouts + stats.invalid_actions
+        if faults > PRESCREEN_MAX_FAULT_RATE * max(stats.calls, 1):
+            print(f"Pre-screen REJECTED '{challenger_name_str}': {stats.exceptions} exceptions, {stats.timeouts} timeouts and "
+                  f"{stats.invalid_actions} invalid actions in {stats.calls} moves.")
+            return False
+    print(f"Pre-screen PASSED: '{challenger_name_str}' goes on to the gauntlet.")
+    return True
+
 
 # --- Main Execution ---
 if __name__ == "__main__":
@@ -621,21 +2876,55 @@ if __name__ == "__main__":
     parser.add_argument('--best_file', type=str, default='best_snake_logic.py', help='Path to the current best overall snake logic file (used as fallback or initial champion).')
     parser.add_argument('--games_per_match', type=int, default=10, help='Number of games per match series in the gauntlet.')
     parser.add_argument('--render', action='store_true', help='Render games visually.')
+    parser.add_argument('--grid-width', type=int, default=GRID_WIDTH, help='Width of the game board.')
+    parser.add_argument('--grid-height', type=int, default=GRID_HEIGHT, help='Height of the game board.')
+    parser.add_argument('--initial-length', type=int, default=INITIAL_SNAKE_LENGTH, help='Initial snake length.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes. With more than one, all gauntlet series are played in parallel and stop once one is lost.')
+    parser.add_argument('--code-cache-dir', nargs='?', const=os.path.join(PAST_CHAMPIONS_DIR, '__codecache__'), default=None, help=f'Also cache compiled AI logic on disk (default directory when no path is given: past_champions/__codecache__). Keeps the {LOGIC_CODE_CACHE_MAX_FILES} most recently used files.')
+    parser.add_argument('--match-cache', nargs='?', const=os.path.join(PAST_CHAMPIONS_DIR, 'match_results.sqlite3'), default=None, help='Reuse game results already played between the same two logic files with the same seed and settings (default file when no path is given: past_champions/match_results.sqlite3). Reused games are not move-profiled.')
+    parser.add_argument('--move-profile-dir', type=str, default=None, help='Time every AI move and write a per-generation JSON latency report (p50/p99/max, exceptions, invalid actions) to this directory.')
+    parser.add_argument('--move-deadline-ms', type=float, default=None, help='Per-move time budget for AI functions. Slower moves are replaced by a random valid action and counted as timeouts.')
+    parser.add_argument('--ai-runner', choices=['inprocess', 'subprocess', 'subprocess-pipe'], default='inprocess', help="Where AI code runs: in the engine process, or isolated in long-lived child processes that read the game state from shared memory ('subprocess') or from binary frames sent over a pipe ('subprocess-pipe').")
+    parser.add_argument('--round-robin', action='store_true', help='Instead of evolving, play every pair of AIs in past_champions/ plus --best_file (--games_per_match games per pair, on --workers processes), write the win matrix and exit. Byte-identical files play only once.')
+    parser.add_argument('--leaderboard-db', type=str, default=LEADERBOARD_DB_FILE, help='SQLite store of crowned champions and the Glicko ratings of every AI that played (exported to leaderboard.json). Several evolution processes may share it; give each its own --challenger_file.')
+    parser.add_argument('--round-robin-output', type=str, default=ROUND_ROBIN_OUTPUT, help='Where --round-robin writes its win matrix (JSON).')
+    parser.add_argument('--prescreen-games', type=int, default=10, help='Games the challenger plays against each built-in baseline (random and greedy-food) before the gauntlet; challengers that crash, time out or lose clearly more often than the reigning champion does on the same games are rejected. 0 disables the pre-screen.')
+    parser.add_argument('--early-stop', choices=['off', 'decided', 'sprt'], default='off', help="Stop a match series early: 'decided' once the remaining games cannot change its result, 'sprt' also when the SPRT bounds are crossed.")
+    parser.add_argument('--sprt-p0', type=float, default=SPRT_P0, help='SPRT null hypothesis: challenger win probability per decisive game.')
+    parser.add_argument('--sprt-p1', type=float, default=SPRT_P1, help='SPRT alternative hypothesis: challenger win probability per decisive game.')
+    parser.add_argument('--sprt-alpha', type=float, default=SPRT_ALPHA, help='SPRT false-positive rate (weak challenger crowned).')
+    parser.add_argument('--sprt-beta', type=float, default=SPRT_BETA, help='SPRT false-negative rate (strong challenger rejected).')
     parser.add_argument('--use-llm', action='store_true', help='Generate challenger logic using an LLM.')
     parser.add_argument('--llm-api-key', type=str, default=os.environ.get("GROQ_API_KEY"), help='API key for Groq. Defaults to GROQ_API_KEY env var.')
+    parser.add_argument('--llm-prefetch', type=int, default=1, help='Challenger candidates the LLM generates ahead, in the background, while the gauntlet runs (0 generates each one only when needed). Queued candidates are dropped when a new champion is crowned.')
+    parser.add_argument('--llm-candidates', type=int, default=1, help='Challenger candidates requested from the LLM per generation (in parallel). Invalid and duplicate ones are dropped, the rest play a round robin and only the winner enters the gauntlet.')
+    parser.add_argument('--candidate-games', type=int, default=4, help='Games per pair in the round robin between LLM candidates.')
+    parser.add_argument('--llm-provider', choices=['groq', 'mock'], default='groq', help="LLM backend for --use-llm. 'mock' works offline: it deterministically answers with past champions, most of them with a few constants mutated.")
+    parser.add_argument('--llm-model', type=str, default=GROQ_MODEL, help='Groq model name.')
+    parser.add_argument('--llm-max-tokens', type=int, default=GROQ_MAX_TOKENS, help='Maximum tokens in a Groq response.')
+    parser.add_argument('--llm-prompt-budget', type=int, default=LLM_PROMPT_TOKEN_BUDGET, help="Token budget for the LLM prompt. The champion's code is sent without comments and dead code, and cut short if the prompt would still exceed this.")
+    parser.add_argument('--llm-mock-latency', type=float, default=0.0, help="Seconds the 'mock' provider waits before answering, to imitate a network call.")
     
     args = parser.parse_args()
+    logic_code_cache_dir = args.code_cache_dir
+    match_cache = open_match_cache(args.match_cache)
+    leaderboard_store = open_leaderboard_store(args.leaderboard_db)
+    ratings = RatingTable(leaderboard_store)
+    game_config = GameConfig(args.grid_width, args.grid_height, args.initial_length)
+    move_deadline = args.move_deadline_ms / 1000 if args.move_deadline_ms else None
+    stop_rule = EarlyStopRule(args.early_stop, args.sprt_p0, args.sprt_p1, args.sprt_alpha, args.sprt_beta)
+    llm_provider = create_llm_provider(args.llm_provider, args.llm_api_key, args.llm_model, args.llm_max_tokens,
+                                       args.llm_mock_latency) if args.use_llm else None
+    prompt_builder = PromptBuilder(SNAKE_CLASS_API_DOCS, format_game_constants_docs(game_config), args.llm_prompt_budget)
+    llm_generate_fn = lambda best_code, generation: generate_challenger_code_with_llm(llm_provider, prompt_builder, best_code, generation)
+    challenger_prefetcher = ChallengerPrefetcher(
+        lambda best_code, generation: generate_challenger_candidates(llm_generate_fn, best_code, generation, args.llm_candidates),
+        args.llm_prefetch)
 
     if not os.path.exists(PAST_CHAMPIONS_DIR):
         os.makedirs(PAST_CHAMPIONS_DIR)
         print(f"Created directory: {PAST_CHAMPIONS_DIR}")
 
-    load_leaderboard() 
-    if leaderboard:
-        current_generation = max(entry.get("generation_crowned", 0) for entry in leaderboard) + 1
-    else:
-        current_generation = 1 
-
     if not os.path.exists(args.challenger_file):
         print(f"Challenger file '{args.challenger_file}' not found. Creating a default placeholder.")
         default_challenger_code = """import random
@@ -681,13 +2970,22 @@ def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_heig
 """
         with open(args.best_file, 'w') as f: f.write(default_best_code)
 
+    if args.round_robin:
+        run_round_robin(archived_logic_files(PAST_CHAMPIONS_DIR) + [args.best_file], args.games_per_match,
+                        MatchSettings(game_config, move_deadline, args.ai_runner), args.workers, match_cache,
+                        args.round_robin_output, ratings)
+        leaderboard_store.export_json()
+        sys.exit(0)
 
     while True:
+        current_generation = leaderboard_store.next_generation() # Unique even with other workers on the same store
         print(f"\n\n=== STARTING GENERATION {current_generation} ===")
         
+        leaderboard = leaderboard_store.leaderboard()
+        reigning_champion = leaderboard_store.current_champion() # The reign this generation's gauntlet challenges
         name_for_current_best_file_logic: str
-        if leaderboard:
-            name_for_current_best_file_logic = leaderboard[0]["name"] # Assumes args.best_file has this logic
+        if reigning_champion:
+            name_for_current_best_file_logic = reigning_champion["name"] # Assumes args.best_file has this logic
         else:
             base_best_filename = os.path.basename(args.best_file).replace('.py','')
             name_for_current_best_file_logic = f"InitialChampion_{base_best_filename}"
@@ -698,16 +2996,9 @@ def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_heig
         llm_generated_new_code_successfully = False
 
         if args.use_llm:
-            print(f"\n--- Generation {current_generation}: Attempting LLM code generation (Groq) ---")
-            api_key_to_use = args.llm_api_key
-            can_attempt_llm = True
-
-            if not api_key_to_use:
-                print("WARNING: Groq API key not provided. LLM generation SKIPPED.")
-                can_attempt_llm = False
-            elif not Groq: 
-                print("CRITICAL: 'groq' library not installed. LLM generation SKIPPED.")
-                can_attempt_llm = False
+            llm_label = llm_provider.label if llm_provider else args.llm_provider
+            print(f"\n--- Generation {current_generation}: Attempting LLM code generation ({llm_label}) ---")
+            can_attempt_llm = llm_provider is not None # create_llm_provider already explained why not
 
             if can_attempt_llm:
                 try:
@@ -717,26 +3008,23 @@ def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_heig
                     print(f"Error: Could not read best snake logic file '{args.best_file}' for LLM. Using fallback content.")
                     current_best_code_content = "# Best code not found. Implement basic survival."
 
-                llm_response_tuple = generate_challenger_code_with_llm(
-                    api_key_to_use,
-                    current_best_code_content,
-                    SNAKE_CLASS_API_DOCS,
-                    GAME_CONSTANTS_DOCS,
-                    current_generation 
-                )
+                llm_candidates = challenger_prefetcher.get(current_best_code_content, current_generation)
+                llm_response_tuple = select_challenger_candidate(llm_candidates, args.candidate_games,
+                                                                 MatchSettings(game_config, move_deadline, args.ai_runner),
+                                                                 args.workers)
 
                 if llm_response_tuple:
                     challenger_name_from_llm, generated_code = llm_response_tuple
                     current_challenger_name = challenger_name_from_llm 
-                    print(f"Groq LLM proposed challenger: '{current_challenger_name}'. Writing code to '{args.challenger_file}'.")
+                    print(f"LLM ({llm_label}) proposed challenger: '{current_challenger_name}'. Writing code to '{args.challenger_file}'.")
                     try:
                         with open(args.challenger_file, 'w') as f: f.write(generated_code)
-                        print(f"Successfully wrote Groq LLM-generated code to {args.challenger_file}")
+                        print(f"Successfully wrote LLM-generated code to {args.challenger_file}")
                         llm_generated_new_code_successfully = True
                     except IOError as e:
-                        print(f"ERROR: Could not write Groq LLM code to {args.challenger_file}: {e}")
+                        print(f"ERROR: Could not write LLM code to {args.challenger_file}: {e}")
                 else:
-                    print(f"Groq LLM code generation or extraction failed for Generation {current_generation}.")
+                    print(f"LLM ({llm_label}) code generation or extraction failed for Generation {current_generation}.")
             
             if not llm_generated_new_code_successfully:
                 print(f"Using existing/default challenger code from '{args.challenger_file}' for Generation {current_generation}.")
@@ -756,37 +3044,69 @@ def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_heig
             args.best_file, # Path to the logic of the current #1 or initial champion
             name_for_current_best_file_logic, # Name for the logic in args.best_file
             PAST_CHAMPIONS_DIR,
-            MAX_GAUNTLET_OPPONENTS
+            MAX_GAUNTLET_OPPONENTS,
+            ratings
         )
 
         if not gauntlet_opponents:
             print("No opponents for gauntlet. Skipping generation. Check configuration and file paths.")
             time.sleep(0.1)
-            current_generation +=1 
             continue
 
         challenger_won_all_gauntlet_matches = True
         if not gauntlet_opponents: # Should be caught above, but for safety
             challenger_won_all_gauntlet_matches = False # Cannot win if no opponents
-
-        for opp_idx, (opponent_name, opponent_logic_file) in enumerate(gauntlet_opponents):
-            print(f"\n>>> Gauntlet Match {opp_idx+1}/{len(gauntlet_opponents)}: Challenger '{current_challenger_name}' vs. Opponent '{opponent_name}' <<<")
-            
-            match_series_won_by_challenger = run_match_series(
+        move_profiler = MoveProfiler() if args.move_profile_dir else None
+
+        if args.prescreen_games > 0 and not prescreen_challenger(args.challenger_file, current_challenger_name,
+                                                                 args.prescreen_games, game_config, move_deadline,
+                                                                 args.ai_runner, args.best_file):
+            challenger_won_all_gauntlet_matches = False
+        elif args.workers > 1 and not args.render:
+            challenger_won_all_gauntlet_matches = run_gauntlet_parallel(
                 args.challenger_file,
-                opponent_logic_file, 
                 current_challenger_name,
-                opponent_name, 
-                args.games_per_match, 
-                args.render
+                gauntlet_opponents,
+                args.games_per_match,
+                args.workers,
+                stop_rule,
+                game_config,
+                move_profiler,
+                move_deadline,
+                args.ai_runner,
+                match_cache,
+                ratings
             )
-            if not match_series_won_by_challenger:
-                challenger_won_all_gauntlet_matches = False
-                print(f"Challenger '{current_challenger_name}' FAILED against '{opponent_name}'. Gauntlet challenge unsuccessful.")
-                break 
-            else:
-                print(f"Challenger '{current_challenger_name}' SUCCEEDED against '{opponent_name}'.")
+        else:
+            for opp_idx, (opponent_name, opponent_logic_file) in enumerate(gauntlet_opponents):
+                print(f"\n>>> Gauntlet Match {opp_idx+1}/{len(gauntlet_opponents)}: Challenger '{current_challenger_name}' vs. Opponent '{opponent_name}' <<<")
+                
+                match_series_won_by_challenger = run_match_series(
+                    args.challenger_file,
+                    opponent_logic_file, 
+                    current_challenger_name,
+                    opponent_name, 
+                    args.games_per_match, 
+                    args.render,
+                    stop_rule=stop_rule,
+                    config=game_config,
+                    profiler=move_profiler,
+                    move_deadline=move_deadline,
+                    ai_runner=args.ai_runner,
+                    cache=match_cache,
+                    ratings=ratings
+                )
+                if not match_series_won_by_challenger:
+                    challenger_won_all_gauntlet_matches = False
+                    print(f"Challenger '{current_challenger_name}' FAILED against '{opponent_name}'. Gauntlet challenge unsuccessful.")
+                    break 
+                else:
+                    print(f"Challenger '{current_challenger_name}' SUCCEEDED against '{opponent_name}'.")
+
 
+        leaderboard_store.export_json() # Ratings changed, and with them the ranking
+        if move_profiler:
+            move_profiler.write_report(os.path.join(args.move_profile_dir, f"move_profile_gen{current_generation}.json"), current_generation)
 
         if challenger_won_all_gauntlet_matches:
             print(f"\n!!! CONGRATULATIONS !!!")
@@ -800,26 +3120,31 @@ def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_heig
             archived_champion_filename_basename = f"{safe_challenger_name}_Gen{current_generation}.py"
             archived_champion_filepath = os.path.join(PAST_CHAMPIONS_DIR, archived_champion_filename_basename)
             
-            try:
+            def install_champion():
+                # Runs inside the store's transaction: archive the code, then swap it into the best file atomically.
                 shutil.copyfile(args.challenger_file, archived_champion_filepath)
                 print(f"Archived new champion's code to: {archived_champion_filepath}")
-            except Exception as e:
-                print(f"Error archiving champion code: {e}")
-                archived_champion_filename_basename = os.path.basename(args.challenger_file) # Fallback
-
-            try:
-                shutil.copyfile(args.challenger_file, args.best_file)
+                tmp_best_file = f"{args.best_file}.{os.getpid()}.tmp"
+                shutil.copyfile(args.challenger_file, tmp_best_file)
+                os.replace(tmp_best_file, args.best_file)
                 print(f"Updated '{args.best_file}' with new champion logic from '{args.challenger_file}'.")
-            except Exception as e:
-                print(f"CRITICAL Error updating best snake logic file '{args.best_file}': {e}. Champion update failed.")
 
-            update_and_display_leaderboard(current_challenger_name, current_generation, archived_champion_filename_basename)
+            try:
+                crowned = leaderboard_store.crown_champion(
+                    current_challenger_name, current_generation, archived_champion_filename_basename,
+                    file_sha256(args.challenger_file), reigning_champion["generation_crowned"] if reigning_champion else None,
+                    install_champion)
+            except (OSError, sqlite3.Error) as e:
+                print(f"CRITICAL Error crowning '{current_challenger_name}': {e}. Champion update failed.")
+                crowned = False
+            if crowned:
+                print(f"\n--- NEW OVERALL CHAMPION: {current_challenger_name} (Crowned at Gen {current_generation}) ---")
+                display_leaderboard(leaderboard_store.leaderboard())
         else:
             print(f"\nChallenger '{current_challenger_name}' did not successfully complete the gauntlet in Generation {current_generation}.")
             if gauntlet_opponents: # Only print if there were opponents
                  print(f"The champion(s) remain: {', '.join([opp[0] for opp in gauntlet_opponents]) if leaderboard else name_for_current_best_file_logic}")
 
 
-        current_generation += 1
-        print(f"Pausing briefly before starting Generation {current_generation}...")
+        print(f"Pausing briefly before starting the next generation...")
         time.sleep(0.1)
\ No newline at end of file
@@ -0,0 +1,19 @@
+import time
+
+import pytest
+
+import main_snake_game as game
+
+SLOW_AI = """SQUARES = [i * j for i in range(100000) for j in range(100000)]
+def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_height):
+    return my_snake.direction_idx
+"""
+
+def test_runner_gives_up_on_a_child_that_never_loads(tmp_path, monkeypatch):
+    path = tmp_path / "slow_ai.py"
+    path.write_text(SLOW_AI)
+    monkeypatch.setattr(game, "AI_RUNNER_START_TIMEOUT", 1.0)
+    start = time.monotonic()
+    with pytest.raises(game.RemoteAIError):
+        game.SubprocessAIRunner(str(path))
+    assert time.monotonic() - start < 4 # The child's own load deadline is 5 s; the engine must not wait for it
@@ -0,0 +1,17 @@
+import main_snake_game as game
+
+def flaky_generate(current_best_code, generation):
+    if generation == 1:
+        raise RuntimeError("LLM request failed")
+    return [(f"Gen{generation}", current_best_code)]
+
+def test_failed_batch_comes_back_empty():
+    # The prefetch thread must survive a failing batch instead of leaving get() waiting forever.
+    prefetcher = game.ChallengerPrefetcher(flaky_generate, depth=1)
+    assert prefetcher.get("code", 0) == [("Gen0", "code")]
+    assert prefetcher.get("code", 1) == []
+    assert prefetcher.get("code", 2) == [("Gen2", "code")]
+
+def test_without_prefetch_failures_come_back_empty():
+    prefetcher = game.ChallengerPrefetcher(flaky_generate, depth=0)
+    assert prefetcher.get("code", 1) == []
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+import main_snake_game as game
+
+# A small board so that games see food, body hits, head-on collisions and the step limit.
+SMALL_CONFIG = game.GameConfig(grid_width=8, grid_height=6, initial_snake_length=3, max_steps_per_episode=40)
+
+def scripted_action(snake, opponent, foods, policy):
+    # Mostly avoids bodies and heads for the food, sometimes wanders, and now and then reverses into its own neck.
+    if not snake.is_alive: return snake.direction_idx
+    if policy.random() < 0.01: return game.Snake.OPPOSITE_ACTIONS_MAP[snake.direction_idx]
+    config, head = snake.config, snake.get_head_position()
+    def next_cell(action):
+        dx, dy = game.Snake.DIRECTIONS_MAP[action]
+        return (head[0] + dx) % config.grid_width, (head[1] + dy) % config.grid_height
+    actions = snake.get_valid_actions()
+    bodies = set(snake.positions) | (set(opponent.positions) if opponent.is_alive else set())
+    safe = [action for action in actions if next_cell(action) not in bodies]
+    if safe and policy.random() < 0.9: actions = safe
+    if foods and policy.random() < 0.6:
+        food = foods[0].position
+        return min(actions, key=lambda action: abs(next_cell(action)[0] - food[0]) + abs(next_cell(action)[1] - food[1]))
+    return policy.choice(actions)
+
+def snake_state(snake):
+    return list(snake.positions), snake.direction_idx, snake.length, snake.score, snake.is_alive
+
+def adopt_food(reference, foods):
+    # The engines draw food cells differently, so the reference takes the other engine's food once it has
+    # checked that the cell is one it could have picked itself.
+    assert len(reference.foods) == len(foods)
+    live_cells = {pos for snake in (reference.snake1, reference.snake2) if snake.is_alive for pos in snake.positions}
+    for food in foods:
+        assert food.position not in live_cells
+    reference.foods = [game.Food(food.position) for food in foods]
+
+@pytest.mark.parametrize("seed", range(25))
+def test_occupancy_grid_matches_scanning_engine(seed):
+    grid_env = game.SnakeEnvironment(SMALL_CONFIG, use_occupancy_grid=True, rng=game.game_rngs(seed)[0])
+    scan_env = game.SnakeEnvironment(SMALL_CONFIG, use_occupancy_grid=False, rng=game.game_rngs(seed)[0])
+    grid_env.reset()
+    scan_env.reset()
+    policy = random.Random(seed)
+    while True:
+        adopt_food(scan_env, grid_env.foods)
+        assert snake_state(grid_env.snake1) == snake_state(scan_env.snake1)
+        assert snake_state(grid_env.snake2) == snake_state(scan_env.snake2)
+        if grid_env.game_over: break
+        action1 = scripted_action(grid_env.snake1, grid_env.snake2, grid_env.foods, policy)
+        action2 = scripted_action(grid_env.snake2, grid_env.snake1, grid_env.foods, policy)
+        assert grid_env.step(action1, action2) == scan_env.step(action1, action2)
+    assert scan_env.game_over
+    assert game.score_game_result(grid_env.snake1, grid_env.snake2) == game.score_game_result(scan_env.snake1, scan_env.snake2)
+
+@pytest.mark.skipif(game.np is None, reason="numpy is not installed")
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_engine_matches_reference_engine(seed):
+    num_games = 40
+    batch = game.BatchSnakeEnvironment(num_games, seed=seed, config=SMALL_CONFIG)
+    batch.reset()
+    references = []
+    for g in range(num_games):
+        # Each reference game starts from the batch's spawn and then runs on its own rules.
+        env = game.SnakeEnvironment(SMALL_CONFIG, use_occupancy_grid=False, rng=game.game_rngs(seed * num_games + g)[0])
+        env.snake1, env.snake2, env.foods = batch.get_snake(g, 0), batch.get_snake(g, 1), batch.get_foods(g)
+        references.append(env)
+    policy = random.Random(seed)
+    while not batch.game_over.all():
+        active = [g for g in range(num_games) if not batch.game_over[g]]
+        actions1, actions2 = [0] * num_games, [0] * num_games
+        for g in active:
+            env = references[g]
+            actions1[g] = scripted_action(env.snake1, env.snake2, env.foods, policy)
+            actions2[g] = scripted_action(env.snake2, env.snake1, env.foods, policy)
+        game_over, killed1, killed2 = batch.step(actions1, actions2)
+        for g in active:
+            env = references[g]
+            assert env.step(actions1[g], actions2[g]) == (game_over[g], killed1[g], killed2[g])
+            adopt_food(env, batch.get_foods(g))
+            assert snake_state(batch.get_snake(g, 0)) == snake_state(env.snake1)
+            assert snake_state(batch.get_snake(g, 1)) == snake_state(env.snake2)
+    assert all(env.game_over for env in references)
+    assert list(batch.game_results()) == [game.score_game_result(env.snake1, env.snake2) for env in references]
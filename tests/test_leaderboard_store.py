@@ -0,0 +1,49 @@
+import threading
+import time
+
+import main_snake_game as game
+
+def run_in_threads(num_threads, target):
+    # Each thread opens its own store, like separate evolution processes sharing one database.
+    barrier = threading.Barrier(num_threads)
+    results = [None] * num_threads
+    def worker(idx):
+        barrier.wait()
+        results[idx] = target(idx)
+    threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(num_threads)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    return results
+
+def test_only_one_store_crowns_against_the_same_champion(tmp_path):
+    db_path = str(tmp_path / "leaderboard.sqlite3")
+    setup = game.LeaderboardStore(db_path, json_export_path=None)
+    setup.crown_champion("Gen1", 1, "Gen1.py", "hash1", None, lambda: None)
+    installed = []
+
+    def crown(idx):
+        store = game.LeaderboardStore(db_path, json_export_path=None)
+        generation = store.next_generation()
+        # A slow install holds the transaction open while the other store tries to crown.
+        crowned = store.crown_champion(f"Challenger{idx}", generation, f"Challenger{idx}.py", f"hash{idx}",
+                                       1, lambda: installed.append(idx) or time.sleep(0.2))
+        store.close()
+        return crowned
+
+    assert sorted(run_in_threads(2, crown)) == [False, True]
+    assert len(installed) == 1
+    assert setup.current_champion()["name"] == f"Challenger{installed[0]}"
+    setup.close()
+
+def test_next_generation_is_never_handed_out_twice(tmp_path):
+    db_path = str(tmp_path / "leaderboard.sqlite3")
+    game.LeaderboardStore(db_path, json_export_path=None).close()
+
+    def claim(idx):
+        store = game.LeaderboardStore(db_path, json_export_path=None)
+        generations = [store.next_generation() for _ in range(25)]
+        store.close()
+        return generations
+
+    generations = [generation for claimed in run_in_threads(4, claim) for generation in claimed]
+    assert sorted(generations) == list(range(1, 101))
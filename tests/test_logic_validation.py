@@ -0,0 +1,75 @@
+import glob
+
+import pytest
+
+import main_snake_game as game
+
+AI_FUNCTION = "\ndef get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_height):\n    return 0\n"
+
+@pytest.mark.parametrize("source", [
+    "import main_snake_game\nmain_snake_game.os.system('true')",
+    "from main_snake_game import os",
+    "import random\nrandom._os.system('true')",
+    "from random import _os",
+    "import random as r\nm = r",
+    "import dataclasses\ndataclasses.sys.modules",
+    "x = getattr(int, 'mro')",
+    "x = [0] * 10**9",
+    "for i in iter(int, 1): pass",
+    "x = [i for i in iter(int, 1)]",
+    "class Loader:\n    while True: pass",
+    "def spin():\n    while True: pass\nspin()",
+    "def spin():\n    while True: pass\nalias = spin\nalias()",
+    "def spin():\n    while True: pass\nHANDLERS = {0: spin}\nHANDLERS[0]()",
+    "def spin(x):\n    while True: pass\nx = sorted([1, 2], key=spin)",
+    "class Spinner:\n    def __init__(self):\n        while True: pass\nSPINNER = Spinner()",
+    "def spin(f):\n    while True: pass\n@spin\ndef g(): pass",
+    "def spin():\n    while True: pass\ndef g(x=spin()): pass",
+    "x = sum(range(10**12))",
+    "import itertools\nx = max(itertools.count())",
+    "class Base:\n    def __init_subclass__(cls):\n        while True: pass",
+    "import operator\nx = operator.attrgetter('__init__.__globals__')",
+    "from operator import methodcaller",
+    "x = '{0.__init__.__globals__}'",
+    "import numpy\nnumpy.savetxt('out.txt', [1])",
+    "from numpy import load",
+    "import numpy.ctypeslib",
+])
+def test_escapes_and_unbounded_module_code_are_rejected(source):
+    assert game.validate_logic_source(source + AI_FUNCTION)
+
+@pytest.mark.parametrize("source", [
+    "from main_snake_game import Snake",
+    "import random\nfrom collections import deque",
+    "import collections.abc\nSequence = collections.abc.Sequence",
+    "DIRECTIONS = [(0, 1), (1, 0)]\nSQUARES = [i * i for i in range(100)]\nfor d in (0, 1, 2, 3): pass",
+    "import functools\n@functools.lru_cache(maxsize=None)\ndef up(): return 0\nHANDLERS = {0: up}",
+    "import operator\nFIRST = operator.itemgetter(0)",
+    '"""Docstrings may mention __init__."""',
+])
+def test_ordinary_logic_is_accepted(source):
+    assert game.validate_logic_source(source + AI_FUNCTION) == []
+
+def test_archived_champions_pass():
+    # generate_manifest.py is a helper script kept in the archive, not an AI.
+    paths = [p for p in glob.glob("past_champions/*.py") if not p.endswith("generate_manifest.py")]
+    for path in paths + ["best_snake_logic.py"]:
+        with open(path) as f:
+            assert game.validate_logic_source(f.read(), path) == [], path
+
+def test_slow_module_code_is_stopped_while_loading(tmp_path, monkeypatch):
+    # Passes the static checks, but would take hours to build.
+    path = tmp_path / "slow_ai.py"
+    path.write_text("SQUARES = [i * j for i in range(100000) for j in range(100000)]" + AI_FUNCTION)
+    assert game.validate_logic_source(path.read_text()) == []
+    monkeypatch.setattr(game, "LOGIC_LOAD_TIMEOUT", 0.2)
+    assert game.load_logic_from_file(str(path), "get_challenger_action") is None
+
+def test_attrgetter_escape_does_not_run(tmp_path, capfd):
+    path = tmp_path / "escape_ai.py"
+    path.write_text("import operator\n"
+                    "def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_height):\n"
+                    "    operator.attrgetter('__init__.__globals__')(my_snake)['os'].system('echo ESCAPED')\n"
+                    "    return my_snake.direction_idx\n")
+    assert game.load_logic_from_file(str(path), "get_challenger_action") is None
+    assert "ESCAPED" not in capfd.readouterr().out
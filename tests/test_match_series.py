@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+import main_snake_game as game
+
+RANDOM_AI = """import random
+def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_height):
+    valid_actions = my_snake.get_valid_actions()
+    return random.choice(valid_actions) if valid_actions else my_snake.direction_idx
+"""
+
+@pytest.fixture
+def random_ai_file(tmp_path):
+    path = tmp_path / "random_ai.py"
+    path.write_text(RANDOM_AI)
+    return str(path)
+
+@pytest.mark.parametrize("mode", ["decided", "sprt"])
+def test_early_stopped_series_on_a_pool(random_ai_file, mode):
+    # The champion settles the series long before 60 games; the cancelled chunks must not break the pool path.
+    random.seed(0)
+    won = game.run_match_series("best_snake_logic.py", random_ai_file, "Champion", "Random", 60, False,
+                                workers=2, stop_rule=game.EarlyStopRule(mode))
+    assert won
+
+def test_parallel_gauntlet_stops_early(random_ai_file):
+    random.seed(0)
+    assert game.run_gauntlet_parallel("best_snake_logic.py", "Champion",
+                                      [("Random1", random_ai_file), ("Random2", random_ai_file)], 60, 2)
+
+def test_pool_and_sequential_series_agree(random_ai_file):
+    # Game k of a series has the same seed however it is scheduled, so both paths see the same games.
+    tallies = []
+    for workers in (1, 2):
+        random.seed(1)
+        tallies.append(game._run_series_in_pool("best_snake_logic.py", "Champion", [("Random", random_ai_file)], 8,
+                                                workers, game.EarlyStopRule(), abort_on_loss=False)[0])
+    assert (tallies[0].wins, tallies[0].losses, tallies[0].ties) == (tallies[1].wins, tallies[1].losses, tallies[1].ties)
+
+def test_repeated_series_is_served_from_the_cache(random_ai_file, tmp_path, monkeypatch):
+    cache = game.MatchResultCache(str(tmp_path / "results.sqlite3"))
+    first = game._run_series_in_pool("best_snake_logic.py", "Champion", [("Random", random_ai_file)], 10, 2,
+                                     game.EarlyStopRule(), abort_on_loss=False, cache=cache)[0]
+    played = []
+    monkeypatch.setattr(game, "play_game", lambda *args, **kwargs: played.append(args) or 0)
+    for _ in range(2):
+        assert game.run_match_series("best_snake_logic.py", random_ai_file, "Champion", "Random", 10, False,
+                                     cache=cache) == first.won
+    assert played == []
+    second = game._run_series_in_pool("best_snake_logic.py", "Champion", [("Random", random_ai_file)], 10, 2,
+                                      game.EarlyStopRule(), abort_on_loss=False, cache=cache)[0]
+    assert (second.wins, second.losses, second.ties) == (first.wins, first.losses, first.ties)
+
+def test_series_with_a_move_deadline_are_not_cached(random_ai_file, tmp_path):
+    cache = game.MatchResultCache(str(tmp_path / "results.sqlite3"))
+    game.run_match_series("best_snake_logic.py", random_ai_file, "Champion", "Random", 4, False,
+                          move_deadline=0.5, cache=cache)
+    assert cache.conn.execute("SELECT COUNT(*) FROM game_results").fetchone()[0] == 0
+
+def test_unloadable_opponent_leaves_ratings_and_win_matrix_alone(random_ai_file, tmp_path):
+    broken_file = tmp_path / "broken_ai.py"
+    broken_file.write_text("def get_challenger_action(:\n")
+    store = game.LeaderboardStore(str(tmp_path / "leaderboard.sqlite3"), json_export_path=None)
+    ratings = game.RatingTable(store)
+    game.run_gauntlet_parallel("best_snake_logic.py", "Champion", [("Broken", str(broken_file)), ("Random", random_ai_file)],
+                               4, 2, ratings=ratings)
+    assert ratings.get(str(broken_file)) is None
+    assert ratings.get(random_ai_file)["games"] > 0
+
+    report = game.run_round_robin(["best_snake_logic.py", str(broken_file), random_ai_file], 2,
+                                  output_path=str(tmp_path / "round_robin.json"), ratings=ratings)
+    assert report["unloadable"] == ["broken_ai"]
+    assert "broken_ai" not in report["scores"]
+    assert report["wins"][1] == [0, 0, 0] and [row[1] for row in report["wins"]] == [0, 0, 0]
+    assert ratings.get(str(broken_file)) is None
+    store.close()
@@ -0,0 +1,32 @@
+import pytest
+
+import main_snake_game as game
+
+STRAIGHT_AI = """def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_height):
+    return my_snake.direction_idx
+"""
+
+CRASHING_AI = """def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_height):
+    raise RuntimeError("bug")
+"""
+
+@pytest.fixture
+def write_ai(tmp_path):
+    def write(name, source):
+        path = tmp_path / name
+        path.write_text(source)
+        return str(path)
+    return write
+
+def test_loss_bound_follows_the_champions_own_record(write_ai):
+    # Loses 6/10 to the greedy baseline: too many on the fixed bound, fine when the champion does the same.
+    straight = write_ai("straight_ai.py", STRAIGHT_AI)
+    assert not game.prescreen_challenger(straight, "Straight", 10)
+    assert game.prescreen_challenger(straight, "Straight", 10, champion_logic_file=straight)
+
+def test_reigning_champion_passes_its_own_prescreen():
+    assert game.prescreen_challenger("best_snake_logic.py", "Champion", 10, champion_logic_file="best_snake_logic.py")
+
+def test_crashing_challenger_is_rejected(write_ai):
+    crashing = write_ai("crashing_ai.py", CRASHING_AI)
+    assert not game.prescreen_challenger(crashing, "Crashing", 10, champion_logic_file="best_snake_logic.py")
@@ -0,0 +1,19 @@
+import main_snake_game as game
+
+def test_only_the_main_guard_is_dropped():
+    source = '''import random
+if __name__ == "__main__":
+    print("demo")
+else:
+    A = 1
+if __name__ != "__main__":
+    B = 2
+def get_challenger_action(my_snake, opponent_snake, foods, grid_width, grid_height):
+    return A + B
+'''
+    stripped = game.strip_champion_source(source)
+    assert "demo" not in stripped
+    assert "A = 1" in stripped and "B = 2" in stripped
+    namespace = {"__name__": "snake_logic_module"}
+    exec(stripped, namespace)
+    assert namespace["get_challenger_action"](None, None, [], 20, 10) == 3